@@ -1,32 +1,66 @@
 """The Ambient One Air Quality integration."""
 from __future__ import annotations
 
-from datetime import timedelta
+from contextlib import suppress
+from functools import partial
 import logging
+from pathlib import Path
+import shutil
 
 import aiohttp
-import async_timeout
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .api import AmbientOneAPIError, AmbientOneAuthError, AmbientOneClient
-from .const import DOMAIN, PLATFORMS, SCAN_INTERVAL_SECONDS
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .backfill import AmbientOneGapFiller
+from .cache import AmbientOneReadingsCache
+from .client.api import AmbientOneAPIError, AmbientOneAuthError, AmbientOneClient
+from .client.stats import AmbientOneStats
+from .const import (
+    ATTR_CYCLES,
+    CONF_BASE_URL,
+    DOMAIN,
+    PLATFORMS,
+    SERVICE_PROFILE,
+    SIGNAL_OPTIONS_UPDATED,
+)
+from .coordinator import AmbientOneCoordinator
+from .device_sync import AmbientOneDeviceSync
+from .profiler import AmbientOneProfiler
 
 _LOGGER = logging.getLogger(__name__)
 
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=3): vol.All(
+            cv.positive_int, vol.Range(min=1, max=100)
+        ),
+    }
+)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ambient One from a config entry."""
     email = entry.data[CONF_EMAIL]
     password = entry.data[CONF_PASSWORD]
 
-    session = async_get_clientsession(hass)
-    client = AmbientOneClient(email, password, session)
+    # Dedicated session so request timings can be traced
+    stats = AmbientOneStats()
+    session = async_create_clientsession(
+        hass, auto_cleanup=False, trace_configs=[stats.trace_config()]
+    )
+    # Released on every unload, also when setup fails. The connector is Home
+    # Assistant's shared pool, so the session is detached rather than closed
+    entry.async_on_unload(session.detach)
+    client = AmbientOneClient(
+        email, password, session, stats=stats, base_url=entry.data.get(CONF_BASE_URL)
+    )
 
     try:
         await client.authenticate()
@@ -39,38 +73,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if not devices:
         _LOGGER.warning("No Ambient One devices found for this account")
 
-    async def async_update_data():
-        """Fetch data from API."""
-        try:
-            async with async_timeout.timeout(30):
-                devices = await client.get_devices()
-                device_data = {}
-
-                for device in devices:
-                    # Get full sensor data
-                    sensor_data = await client.get_sensor_data(device.device_id, realtime=False)
-                    device_data[device.device_id] = {
-                        "device": device,
-                        "sensor_data": sensor_data,
-                    }
-
-                return device_data
-        except AmbientOneAuthError as err:
-            raise ConfigEntryAuthFailed(f"Authentication failed: {err}") from err
-        except AmbientOneAPIError as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=SCAN_INTERVAL_SECONDS),
+    coordinator = AmbientOneCoordinator(hass, client, entry.options)
+
+    # Imports readings missed while offline as statistics
+    coordinator.gap_filler = AmbientOneGapFiller(
+        hass, entry.entry_id, client, coordinator.async_store_history
     )
+    await coordinator.gap_filler.async_load()
+
+    # Local history of minute readings, see cache.py
+    cache = AmbientOneReadingsCache(_cache_path(hass, entry))
+    await hass.async_add_executor_job(_load_cache, cache, _legacy_cache_path(hass, entry))
+    coordinator.cache = cache
+    await coordinator.async_restore_aggregates()
 
     # Fetch initial data
     await coordinator.async_config_entry_first_refresh()
 
+    # Keep the device registry in step with name/firmware/area changes
+    device_sync = AmbientOneDeviceSync(hass, coordinator)
+    entry.async_on_unload(
+        coordinator.async_add_listener(device_sync.async_handle_coordinator_update)
+    )
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
@@ -79,14 +104,88 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
+
+    if not hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        _async_register_services(hass)
+
     return True
 
 
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the entry or logging in again."""
+    coordinator: AmbientOneCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    coordinator.apply_options(entry.options)
+
+    # Lets the sensor platform add and remove entities for the sensor keys
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
+
+    await coordinator.async_request_refresh()
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register integration services."""
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the next refreshes of every loaded entry."""
+        cycles = call.data[ATTR_CYCLES]
+        # One profiler for all entries, their refreshes may overlap
+        profiler = AmbientOneProfiler(hass, DOMAIN, cycles)
+        for entry_data in hass.data[DOMAIN].values():
+            coordinator = entry_data["coordinator"]
+            profiler.watch(coordinator)
+            coordinator.profiler = profiler
+        _LOGGER.warning(
+            "Profiling the next %s Ambient One update(s), the report is written "
+            "to the config directory",
+            cycles,
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
+
+
+def _cache_path(hass: HomeAssistant, entry: ConfigEntry) -> Path:
+    """Return the directory of an entry's readings cache."""
+    return Path(hass.config.path(f"{DOMAIN}_cache", entry.entry_id))
+
+
+def _legacy_cache_path(hass: HomeAssistant, entry: ConfigEntry) -> Path:
+    """Return where the readings cache was kept before, inside .storage."""
+    return Path(hass.config.path(".storage", f"{DOMAIN}_cache", entry.entry_id))
+
+
+def _load_cache(cache: AmbientOneReadingsCache, legacy_path: Path) -> None:
+    """Move a cache out of .storage and open it, runs in an executor."""
+    if legacy_path.is_dir() and not cache.path.exists():
+        cache.path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(legacy_path, cache.path)
+        # Leaves .storage/ambient_one_cache once no entry is left in it
+        with suppress(OSError):
+            legacy_path.parent.rmdir()
+    cache.load()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a deleted entry."""
+    await AmbientOneGapFiller(hass, entry.entry_id, None).async_remove()
+    for path in (_cache_path(hass, entry), _legacy_cache_path(hass, entry)):
+        await hass.async_add_executor_job(
+            partial(shutil.rmtree, path, ignore_errors=True)
+        )
+        # The shared parent goes with the last cache, rmdir fails while others remain
+        with suppress(OSError):
+            await hass.async_add_executor_job(path.parent.rmdir)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
 
     return unload_ok
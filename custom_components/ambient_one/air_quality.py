@@ -8,10 +8,11 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONCENTRATION_MICROGRAMS_PER_CUBIC_METER
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .api import AmbientOneDevice
+from .client.api import AmbientOneDevice
 from .const import DOMAIN
+from .device_sync import build_device_info
+from .entity import AmbientOneEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,7 +34,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class AmbientOneAirQuality(CoordinatorEntity, AirQualityEntity):
+class AmbientOneAirQuality(AmbientOneEntity, AirQualityEntity):
     """Representation of an Ambient One Air Quality entity."""
 
     _attr_has_entity_name = True
@@ -48,13 +49,7 @@ class AmbientOneAirQuality(CoordinatorEntity, AirQualityEntity):
         self._attr_name = "Air Quality"
 
         # Device info for grouping entities
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, device.device_id)},
-            "name": device.name,
-            "manufacturer": "Ambient Works",
-            "model": "Ambient One",
-            "sw_version": device.firmware_version,
-        }
+        self._attr_device_info = build_device_info(device)
 
     @property
     def air_quality_index(self) -> float | None:
@@ -0,0 +1,213 @@
+"""Threshold alerts for Ambient One readings."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.util import slugify
+
+from .client.api import SENSOR_METRICS, AmbientOneSensorData
+from .const import CONF_ALERTS
+
+CONF_NAME = "name"
+CONF_METRIC = "metric"
+CONF_ABOVE = "above"
+CONF_BELOW = "below"
+CONF_HYSTERESIS = "hysteresis"
+CONF_DURATION = "duration"
+
+# Written to the options of new entries by the config flow, thresholds from
+# common indoor air guidelines
+DEFAULT_ALERTS: list[dict[str, Any]] = [
+    {
+        CONF_NAME: "High CO2",
+        CONF_METRIC: "co2",
+        CONF_ABOVE: 1000,
+        CONF_HYSTERESIS: 100,
+        CONF_DURATION: 300,
+    },
+    {
+        CONF_NAME: "High PM2.5",
+        CONF_METRIC: "pm2_5",
+        CONF_ABOVE: 35,
+        CONF_HYSTERESIS: 5,
+        CONF_DURATION: 300,
+    },
+]
+
+
+def _unique_names(alerts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    keys = [slugify(alert[CONF_NAME]) for alert in alerts]
+    if len(set(keys)) != len(keys):
+        raise vol.Invalid("Alert names must be unique")
+    return alerts
+
+
+ALERT_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(CONF_NAME): vol.All(str, vol.Length(min=1)),
+            vol.Required(CONF_METRIC): vol.In(SENSOR_METRICS),
+            vol.Exclusive(CONF_ABOVE, "threshold"): vol.Coerce(float),
+            vol.Exclusive(CONF_BELOW, "threshold"): vol.Coerce(float),
+            vol.Optional(CONF_HYSTERESIS, default=0): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+            vol.Optional(CONF_DURATION, default=0): vol.All(
+                vol.Coerce(int), vol.Range(min=0)
+            ),
+        }
+    ),
+    vol.Any(
+        vol.Schema({vol.Required(CONF_ABOVE): object}, extra=vol.ALLOW_EXTRA),
+        vol.Schema({vol.Required(CONF_BELOW): object}, extra=vol.ALLOW_EXTRA),
+        msg="Either above or below is required",
+    ),
+)
+ALERTS_SCHEMA = vol.All([ALERT_SCHEMA], _unique_names)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """A threshold on one metric with hysteresis and a minimum duration.
+
+    The alert turns on once the value is above `above` (or below `below`)
+    for `duration`, and off once it is back by more than `hysteresis` for
+    `duration`.
+    """
+
+    name: str
+    metric: str
+    above: float | None = None
+    below: float | None = None
+    hysteresis: float = 0.0
+    duration: timedelta = timedelta()
+
+    @property
+    def key(self) -> str:
+        """Return the key used in unique IDs and events."""
+        return slugify(self.name)
+
+    def breached(self, value: float, active: bool) -> bool:
+        """Return whether the alert should be on for a value."""
+        if self.above is not None:
+            return value > (self.above - self.hysteresis if active else self.above)
+        return value < (self.below + self.hysteresis if active else self.below)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> AlertRule:
+        """Create a rule from an entry of the alerts option."""
+        return cls(
+            name=config[CONF_NAME],
+            metric=config[CONF_METRIC],
+            above=config.get(CONF_ABOVE),
+            below=config.get(CONF_BELOW),
+            hysteresis=config.get(CONF_HYSTERESIS, 0),
+            duration=timedelta(seconds=config.get(CONF_DURATION, 0)),
+        )
+
+
+def alert_rules(options: Mapping[str, Any]) -> list[AlertRule]:
+    """Return the alert rules configured in the entry options."""
+    return [
+        AlertRule.from_config(config)
+        for config in ALERTS_SCHEMA(options.get(CONF_ALERTS, []))
+    ]
+
+
+@dataclass
+class AlertState:
+    """State of one rule for one device."""
+
+    active: bool = False
+    value: float | None = None
+    # Since when the value asks for the opposite state
+    pending_since: datetime | None = None
+
+
+@dataclass
+class AlertChange:
+    """An alert that turned on or off."""
+
+    device_id: str
+    rule: AlertRule
+    active: bool
+    value: float
+
+
+class AmbientOneAlertEngine:
+    """Evaluate all alert rules against the readings of all devices.
+
+    The coordinator calls `evaluate` once per update with the readings of
+    every device. That single pass replaces a template binary sensor per
+    device and threshold, which Home Assistant would render on every
+    state change. A reading without a value for a rule's metric leaves the
+    alert as it is.
+    """
+
+    def __init__(self, rules: list[AlertRule] | None = None) -> None:
+        """Initialize the engine."""
+        self.rules: dict[str, AlertRule] = {}
+        self._states: dict[tuple[str, str], AlertState] = {}
+        self.set_rules(rules or [])
+
+    def set_rules(self, rules: list[AlertRule]) -> None:
+        """Replace the rules, keeping the state of rules that are unchanged."""
+        previous = self.rules
+        self.rules = {rule.key: rule for rule in rules}
+        self._states = {
+            (device_id, key): state
+            for (device_id, key), state in self._states.items()
+            if previous.get(key) == self.rules.get(key)
+        }
+
+    def evaluate(
+        self, device_data: Mapping[str, Mapping[str, Any]], now: datetime
+    ) -> list[AlertChange]:
+        """Update all alerts from the latest readings, return the changes."""
+        changes: list[AlertChange] = []
+        for device_id, data in device_data.items():
+            sensor_data: AmbientOneSensorData | None = data.get("sensor_data")
+            if sensor_data is None:
+                continue
+            for key, rule in self.rules.items():
+                value = getattr(sensor_data, rule.metric)
+                if value is None:
+                    continue
+                state = self._states.get((device_id, key))
+                if state is None:
+                    state = self._states[(device_id, key)] = AlertState()
+                state.value = value
+
+                if rule.breached(value, state.active) == state.active:
+                    state.pending_since = None
+                    continue
+                if state.pending_since is None:
+                    state.pending_since = now
+                if now - state.pending_since >= rule.duration:
+                    state.active = not state.active
+                    state.pending_since = None
+                    changes.append(AlertChange(device_id, rule, state.active, value))
+        return changes
+
+    def state(self, device_id: str, key: str) -> AlertState | None:
+        """Return the state of an alert, None before it had a value."""
+        return self._states.get((device_id, key))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the active and pending alerts for diagnostics."""
+        return {
+            f"{device_id}.{key}": {
+                "active": state.active,
+                "value": state.value,
+                "pending_since": (
+                    state.pending_since.isoformat() if state.pending_since else None
+                ),
+            }
+            for (device_id, key), state in self._states.items()
+            if state.active or state.pending_since
+        }
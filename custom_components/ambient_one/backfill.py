@@ -0,0 +1,230 @@
+"""Gap filling of missed readings for Ambient One."""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .client.api import AmbientOneAPIError, AmbientOneClient, AmbientOneSensorData
+from .const import DOMAIN
+from .sensor import SENSOR_TYPES
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Readings further apart than this, or two update intervals if that is
+# longer, count as a gap
+GAP_THRESHOLD = timedelta(minutes=5)
+# The recorder compiles an hour shortly after it ended, import after that
+SETTLE_DELAY = timedelta(minutes=15)
+# Longer gaps are imported over several updates
+MAX_IMPORT_SPAN = timedelta(hours=24)
+
+# Sensors with hourly mean/min/max statistics
+STATISTIC_TYPES = [
+    description
+    for description in SENSOR_TYPES
+    if description.value_fn is not None
+    and description.state_class == SensorStateClass.MEASUREMENT
+]
+
+
+def _hour(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class AmbientOneGapFiller:
+    """Import readings missed during outages as hourly statistics.
+
+    Each update the newest reading of every device is compared with the
+    previous one, which is kept in storage so outages of Home Assistant
+    itself are noticed, too. For a gap, the hours from the one of the last
+    reading before it to the one of the first reading after it are imported
+    once they are complete. They are fetched from the minute averages with
+    one paged range query per batch of devices and written with
+    async_import_statistics, instead of as a burst of state changes. The
+    fetched readings are also passed to `store_history`, so the readings
+    cache and the hour and day aggregates have no gaps either.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        client: AmbientOneClient | None,
+        store_history: Callable[[list[AmbientOneSensorData]], Awaitable[None]]
+        | None = None,
+    ) -> None:
+        """Initialize the gap filler."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.client = client
+        self.store_history = store_history
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.backfill"
+        )
+        self._last_seen: dict[str, str] = {}
+        # Device ID to the [start, end) hours still to import
+        self._pending: dict[str, tuple[datetime, datetime]] = {}
+        self._importing = False
+        self.imported_hours = 0
+
+    async def async_load(self) -> None:
+        """Load the last seen timestamps and pending gaps."""
+        data = await self._store.async_load() or {}
+        self._last_seen = data.get("last_seen", {})
+        self._pending = {
+            device_id: (dt_util.parse_datetime(start), dt_util.parse_datetime(end))
+            for device_id, (start, end) in data.get("pending", {}).items()
+        }
+
+    async def async_remove(self) -> None:
+        """Remove the stored state."""
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "last_seen": self._last_seen,
+            "pending": {
+                device_id: [start.isoformat(), end.isoformat()]
+                for device_id, (start, end) in self._pending.items()
+            },
+        }
+
+    @callback
+    def async_update(
+        self,
+        device_data: dict[str, dict[str, Any]],
+        update_interval: timedelta | None = None,
+    ) -> None:
+        """Look for gaps in new readings and start importing complete hours."""
+        threshold = max(GAP_THRESHOLD, 2 * (update_interval or timedelta()))
+        for device_id, data in device_data.items():
+            sensor_data: AmbientOneSensorData | None = data.get("sensor_data")
+            if not sensor_data or not sensor_data.timestamp:
+                continue
+            timestamp = dt_util.parse_datetime(sensor_data.timestamp)
+            last_seen = self._last_seen.get(device_id)
+            last = dt_util.parse_datetime(last_seen) if last_seen else None
+            if timestamp is None:
+                continue
+
+            if last is not None and timestamp - last > threshold:
+                start, end = _hour(last), _hour(timestamp) + timedelta(hours=1)
+                if device_id in self._pending:
+                    pending_start, pending_end = self._pending[device_id]
+                    start, end = min(start, pending_start), max(end, pending_end)
+                self._pending[device_id] = (start, end)
+                _LOGGER.debug(
+                    "Gap in readings of %s from %s to %s", device_id, last, timestamp
+                )
+            self._last_seen[device_id] = sensor_data.timestamp
+
+        self._store.async_delay_save(self._data_to_save, 60)
+
+        if self._pending and not self._importing and "recorder" in self.hass.config.components:
+            self._importing = True
+            self.hass.async_create_background_task(
+                self._async_import(), f"{DOMAIN}_{self.entry_id}_backfill"
+            )
+
+    async def _async_import(self) -> None:
+        """Import all complete pending hours."""
+        try:
+            ready = _hour(dt_util.utcnow() - SETTLE_DELAY)
+            due = {
+                device_id: (start, min(end, ready, start + MAX_IMPORT_SPAN))
+                for device_id, (start, end) in self._pending.items()
+                if start < ready
+            }
+            if not due:
+                return
+
+            history = await self.client.get_sensor_history(
+                list(due),
+                min(start for start, _ in due.values()),
+                max(end for _, end in due.values()),
+            )
+            self._import_statistics(history, due)
+            if self.store_history is not None:
+                await self.store_history(history)
+
+            for device_id, (_, imported_until) in due.items():
+                start, end = self._pending[device_id]
+                if imported_until >= end:
+                    del self._pending[device_id]
+                else:
+                    self._pending[device_id] = (imported_until, end)
+            self._store.async_delay_save(self._data_to_save, 60)
+        except AmbientOneAPIError as err:
+            _LOGGER.debug("Failed to fetch missed readings, retrying later: %s", err)
+        finally:
+            self._importing = False
+
+    def _import_statistics(
+        self,
+        history: list[AmbientOneSensorData],
+        due: dict[str, tuple[datetime, datetime]],
+    ) -> None:
+        """Aggregate minute readings to hours and import them per sensor."""
+        # (device ID, sensor key) -> hour -> values
+        values: dict[tuple[str, str], dict[datetime, list[float]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        for reading in history:
+            timestamp = dt_util.parse_datetime(reading.timestamp or "")
+            if timestamp is None or reading.device_id not in due:
+                continue
+            start, end = due[reading.device_id]
+            if not start <= timestamp < end:
+                continue
+            for description in STATISTIC_TYPES:
+                value = description.value_fn(reading)
+                if value is not None:
+                    values[(reading.device_id, description.key)][_hour(timestamp)].append(
+                        value
+                    )
+
+        registry = er.async_get(self.hass)
+        descriptions = {description.key: description for description in STATISTIC_TYPES}
+        for (device_id, key), hours in values.items():
+            entity_id = registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, f"{device_id}_{key}"
+            )
+            if entity_id is None:
+                continue
+
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=None,
+                source="recorder",
+                statistic_id=entity_id,
+                unit_of_measurement=descriptions[key].native_unit_of_measurement,
+            )
+            async_import_statistics(
+                self.hass,
+                metadata,
+                [
+                    StatisticData(
+                        start=hour,
+                        mean=sum(hour_values) / len(hour_values),
+                        min=min(hour_values),
+                        max=max(hour_values),
+                    )
+                    for hour, hour_values in sorted(hours.items())
+                ],
+            )
+            self.imported_hours += len(hours)
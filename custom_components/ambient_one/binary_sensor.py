@@ -0,0 +1,117 @@
+"""Binary sensor platform for Ambient One alerts."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .alerts import AlertRule
+from .client.api import AmbientOneDevice
+from .const import DOMAIN, SIGNAL_OPTIONS_UPDATED
+from .coordinator import AmbientOneCoordinator
+from .device_sync import build_device_info
+from .entity import AmbientOneEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up an alert binary sensor per device and alert rule."""
+    coordinator: AmbientOneCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    def build(rules: list[AlertRule]) -> list[AmbientOneAlertBinarySensor]:
+        return [
+            AmbientOneAlertBinarySensor(coordinator, device_data["device"], rule)
+            for device_data in coordinator.data.values()
+            for rule in rules
+        ]
+
+    added_rules = dict(coordinator.alerts.rules)
+    async_add_entities(build(list(added_rules.values())))
+
+    @callback
+    def async_options_updated() -> None:
+        """Add and remove alert sensors after the alerts option changed."""
+        nonlocal added_rules
+        rules = coordinator.alerts.rules
+        removed = added_rules.keys() - rules.keys()
+        added = [rule for key, rule in rules.items() if key not in added_rules]
+        added_rules = dict(rules)
+
+        if removed:
+            registry = er.async_get(hass)
+            removed_ids = {
+                f"{device_id}_alert_{key}"
+                for device_id in coordinator.data
+                for key in removed
+            }
+            for entity_entry in er.async_entries_for_config_entry(
+                registry, entry.entry_id
+            ):
+                if entity_entry.unique_id in removed_ids:
+                    registry.async_remove(entity_entry.entity_id)
+
+        if added:
+            async_add_entities(build(added))
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), async_options_updated
+        )
+    )
+
+
+class AmbientOneAlertBinarySensor(AmbientOneEntity, BinarySensorEntity):
+    """An alert rule evaluated for one device."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(
+        self,
+        coordinator: AmbientOneCoordinator,
+        device: AmbientOneDevice,
+        rule: AlertRule,
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+        self._device_id = device.device_id
+        self._key = rule.key
+
+        self._attr_unique_id = f"{device.device_id}_alert_{rule.key}"
+        self._attr_name = f"{device.name} {rule.name}"
+        self._attr_device_info = build_device_info(device)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return whether the alert is active, None before a reading."""
+        state = self.coordinator.alerts.state(self._device_id, self._key)
+        return state.active if state else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the rule and the value it was last checked against."""
+        rule = self.coordinator.alerts.rules.get(self._key)
+        if rule is None:
+            return {}
+        state = self.coordinator.alerts.state(self._device_id, self._key)
+        attributes: dict[str, Any] = {
+            "metric": rule.metric,
+            "hysteresis": rule.hysteresis,
+            "duration": rule.duration.total_seconds(),
+            "value": state.value if state else None,
+        }
+        if rule.above is not None:
+            attributes["above"] = rule.above
+        else:
+            attributes["below"] = rule.below
+        return attributes
@@ -0,0 +1,339 @@
+"""On-disk columnar cache of Ambient One readings."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import math
+import mmap
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+from .client.api import SENSOR_METRICS, AmbientOneSensorData
+from .client.downsample import parse_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Metric columns, stored as float32 with NaN for missing values
+CACHE_COLUMNS = SENSOR_METRICS
+TIMESTAMP_COLUMN = "timestamp"
+
+DEFAULT_RETENTION = timedelta(days=30)
+# Compact once this much more than the retention is stored
+COMPACT_SLACK = timedelta(days=1)
+
+_TYPECODES = {TIMESTAMP_COLUMN: "q", **{column: "f" for column in CACHE_COLUMNS}}
+
+
+@dataclass
+class CachedRange:
+    """Columns of the cached rows in a time range.
+
+    The columns are memoryviews into the memory-mapped files, slicing and
+    indexing them does not copy. Timestamps are UTC epoch seconds, missing
+    metric values are NaN.
+    """
+
+    timestamps: memoryview
+    columns: dict[str, memoryview]
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.timestamps)
+
+
+class _DeviceColumns:
+    """The column files of one device."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._views: dict[str, memoryview] | None = None
+        self.rows = self._repair()
+        # Kept in memory, appends then need no mapping
+        self.first = self._read_timestamp(0)
+        self.last = self._read_timestamp(self.rows - 1)
+
+    def file(self, column: str) -> Path:
+        return self.path / f"{column}.{_TYPECODES[column]}"
+
+    def _repair(self) -> int:
+        """Cut all columns to the shortest, an append may have been interrupted."""
+        counts = {
+            column: (file.stat().st_size if (file := self.file(column)).exists() else 0)
+            // array(typecode).itemsize
+            for column, typecode in _TYPECODES.items()
+        }
+        rows = min(counts.values())
+        for column, count in counts.items():
+            if count > rows:
+                _LOGGER.warning("Repairing readings cache column %s", self.file(column))
+                os.truncate(self.file(column), rows * array(_TYPECODES[column]).itemsize)
+        return rows
+
+    def _read_timestamp(self, row: int) -> int | None:
+        if not 0 <= row < self.rows:
+            return None
+        values = array(_TYPECODES[TIMESTAMP_COLUMN])
+        with open(self.file(TIMESTAMP_COLUMN), "rb") as f:
+            f.seek(row * values.itemsize)
+            values.fromfile(f, 1)
+        return values[0]
+
+    def views(self) -> dict[str, memoryview]:
+        """Map the column files, remapped after appends and compaction."""
+        if self._views is None:
+            views = {}
+            for column, typecode in _TYPECODES.items():
+                with open(self.file(column), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                views[column] = memoryview(mapped).cast(typecode)
+            self._views = views
+        return self._views
+
+    def append(self, readings: list[AmbientOneSensorData], cutoff: int) -> int:
+        """Store readings not cached yet and not older than cutoff.
+
+        Readings newer than the last cached one are appended. Older ones,
+        such as minutes fetched after a gap, are merged in by rewriting the
+        columns.
+        """
+        rows: dict[int, AmbientOneSensorData] = {}
+        for reading in readings:
+            timestamp = _epoch(reading.timestamp)
+            if timestamp is not None and timestamp >= cutoff:
+                rows[timestamp] = reading
+
+        last = self.last
+        older = {
+            timestamp: reading
+            for timestamp, reading in rows.items()
+            if last is not None and timestamp <= last
+        }
+        added = self._merge(older) if older else 0
+
+        timestamps = array("q")
+        columns = {column: array("f") for column in CACHE_COLUMNS}
+        for timestamp in sorted(rows.keys() - older.keys()):
+            timestamps.append(timestamp)
+            for column, values in columns.items():
+                values.append(_value(rows[timestamp], column))
+
+        if not timestamps:
+            return added
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Metrics first, the timestamp index last marks the rows complete
+        for column, values in (*columns.items(), (TIMESTAMP_COLUMN, timestamps)):
+            with open(self.file(column), "ab") as f:
+                values.tofile(f)
+        self.rows += len(timestamps)
+        self.last = timestamps[-1]
+        if self.first is None:
+            self.first = timestamps[0]
+        self._views = None
+        return added + len(timestamps)
+
+    def _merge(self, rows: dict[int, AmbientOneSensorData]) -> int:
+        """Insert rows older than the last cached one, return how many."""
+        views = self.views()
+        index = views[TIMESTAMP_COLUMN]
+        new = [
+            timestamp
+            for timestamp in sorted(rows)
+            if (position := bisect_left(index, timestamp)) == self.rows
+            or index[position] != timestamp
+        ]
+        if not new:
+            return 0
+
+        merged = {column: array(typecode) for column, typecode in _TYPECODES.items()}
+        copied = 0
+        for timestamp in new:
+            position = bisect_left(index, timestamp, copied)
+            for column, values in merged.items():
+                values.frombytes(views[column][copied:position].tobytes())
+                values.append(
+                    timestamp if column == TIMESTAMP_COLUMN else _value(rows[timestamp], column)
+                )
+            copied = position
+        for column, values in merged.items():
+            values.frombytes(views[column][copied:].tobytes())
+
+        # Like compaction, the timestamp index is replaced last
+        for column, values in (
+            *((column, merged[column]) for column in CACHE_COLUMNS),
+            (TIMESTAMP_COLUMN, merged[TIMESTAMP_COLUMN]),
+        ):
+            file = self.file(column)
+            temp = file.with_suffix(file.suffix + ".tmp")
+            with open(temp, "wb") as f:
+                values.tofile(f)
+            os.replace(temp, file)
+        self.rows += len(new)
+        self.first = min(self.first, new[0])
+        self._views = None
+        return len(new)
+
+    def compact(self, cutoff: int) -> int:
+        """Drop rows older than cutoff, return how many were dropped."""
+        drop = bisect_left(self.views()[TIMESTAMP_COLUMN], cutoff)
+        if not drop:
+            return 0
+
+        for column, view in self.views().items():
+            file = self.file(column)
+            temp = file.with_suffix(file.suffix + ".tmp")
+            with open(temp, "wb") as f:
+                f.write(view[drop:])
+            # Existing views keep the old file mapped until they are released
+            os.replace(temp, file)
+        self.rows -= drop
+        self._views = None
+        self.first = self._read_timestamp(0)
+        self.last = self._read_timestamp(self.rows - 1)
+        return drop
+
+    def range(self, start: int, end: int) -> CachedRange:
+        if not self.rows:
+            return _empty_range()
+        views = self.views()
+        timestamps = views[TIMESTAMP_COLUMN]
+        lo = bisect_left(timestamps, start)
+        hi = bisect_left(timestamps, end, lo)
+        return CachedRange(
+            timestamps[lo:hi],
+            {column: views[column][lo:hi] for column in CACHE_COLUMNS},
+        )
+
+
+def _empty_range() -> CachedRange:
+    return CachedRange(
+        memoryview(array("q")),
+        {column: memoryview(array("f")) for column in CACHE_COLUMNS},
+    )
+
+
+def _value(reading: AmbientOneSensorData, column: str) -> float:
+    value = getattr(reading, column)
+    return math.nan if value is None else value
+
+
+def _epoch(timestamp: str | None) -> int | None:
+    # Naive timestamps are UTC, like everywhere else, not local time
+    parsed = parse_timestamp(timestamp)
+    return int(parsed.timestamp()) if parsed is not None else None
+
+
+class AmbientOneReadingsCache:
+    """Per-device cache of minute averages.
+
+    Every device has a directory with one file per column: int64 UTC epoch
+    seconds as the timestamp index and float32 metrics. Rows are kept in
+    timestamp order, so range queries are a binary search over the
+    memory-mapped index and return views without copying. New readings are
+    appended; older ones, like the minutes fetched after a gap, are merged
+    in by rewriting the columns. Rows older than the retention are dropped
+    by compaction, which rewrites the columns once a day's worth of expired
+    rows piled up.
+
+    File access blocks, in Home Assistant call the methods in an executor.
+    Writes are serialized, so they may run in several executor jobs at once.
+    Reads never create files or directories.
+    """
+
+    def __init__(self, path: Path, retention: timedelta = DEFAULT_RETENTION) -> None:
+        """Initialize the cache in the given directory."""
+        self.path = path
+        self.retention = retention
+        self._devices: dict[str, _DeviceColumns] = {}
+        self._lock = threading.Lock()
+
+    def _device(self, device_id: str) -> _DeviceColumns:
+        if device_id not in self._devices:
+            self._devices[device_id] = _DeviceColumns(self.path / device_id)
+        return self._devices[device_id]
+
+    @property
+    def device_ids(self) -> list[str]:
+        """Return the IDs of all devices with cached rows."""
+        return [device_id for device_id, device in self._devices.items() if device.rows]
+
+    def append(self, readings: Iterable[AmbientOneSensorData]) -> int:
+        """Store readings within the retention, return how many rows were new."""
+        by_device: dict[str, list[AmbientOneSensorData]] = {}
+        for reading in readings:
+            if reading.device_id:
+                by_device.setdefault(reading.device_id, []).append(reading)
+
+        added = 0
+        cutoff = int(time.time() - self.retention.total_seconds())
+        with self._lock:
+            for device_id, device_readings in by_device.items():
+                device = self._device(device_id)
+                added += device.append(device_readings, cutoff)
+
+                slack = COMPACT_SLACK.total_seconds()
+                if device.first is not None and device.first < cutoff - slack:
+                    dropped = device.compact(cutoff)
+                    _LOGGER.debug(
+                        "Compacted readings cache of %s, dropped %s rows", device_id, dropped
+                    )
+        return added
+
+    def range(self, device_id: str, start: datetime, end: datetime) -> CachedRange:
+        """Return the cached rows of a device with `start <= timestamp < end`."""
+        with self._lock:
+            device = self._devices.get(device_id)
+            if device is None:
+                return _empty_range()
+            return device.range(int(start.timestamp()), int(end.timestamp()))
+
+    def readings(
+        self, device_id: str, start: datetime, end: datetime
+    ) -> list[AmbientOneSensorData]:
+        """Return the cached rows of a device in a time range as readings."""
+        cached = self.range(device_id, start, end)
+        return [
+            AmbientOneSensorData(
+                {
+                    "device_id": device_id,
+                    "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                    **{
+                        column: value
+                        for column, values in cached.columns.items()
+                        if not math.isnan(value := values[row])
+                    },
+                }
+            )
+            for row, timestamp in enumerate(cached.timestamps)
+        ]
+
+    def last_timestamp(self, device_id: str) -> datetime | None:
+        """Return the timestamp of the newest cached row of a device."""
+        device = self._devices.get(device_id)
+        timestamp = device.last if device else None
+        return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else None
+
+    def load(self) -> None:
+        """Open the caches of all devices found on disk."""
+        if self.path.exists():
+            for device_path in self.path.iterdir():
+                if device_path.is_dir():
+                    self._device(device_path.name)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return row counts and time spans for diagnostics."""
+        return {
+            device_id: {
+                "rows": device.rows,
+                "first": device.first,
+                "last": device.last,
+            }
+            for device_id, device in self._devices.items()
+        }
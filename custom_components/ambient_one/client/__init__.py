@@ -0,0 +1,26 @@
+"""Ambient One cloud client.
+
+These modules do not depend on Home Assistant. The integration imports them
+from here, and `pyproject.toml` at the repository root installs this
+directory as the standalone `ambient_one` package.
+"""
+from __future__ import annotations
+
+from .api import (
+    AmbientOneAPIError,
+    AmbientOneAuthError,
+    AmbientOneClient,
+    AmbientOneDevice,
+    AmbientOneSensorData,
+)
+from .downsample import AmbientOneDownsampler, aggregate_history
+
+__all__ = [
+    "AmbientOneAPIError",
+    "AmbientOneAuthError",
+    "AmbientOneClient",
+    "AmbientOneDevice",
+    "AmbientOneDownsampler",
+    "AmbientOneSensorData",
+    "aggregate_history",
+]
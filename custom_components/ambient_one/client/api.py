@@ -0,0 +1,755 @@
+"""Ambient One API client."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta, timezone
+from functools import partial
+import json
+import logging
+import time
+from typing import Any
+from urllib.parse import quote
+
+import aiohttp
+
+from .stats import AmbientOneStats
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://cszlzkwrpugdncexjkbd.supabase.co"
+
+# Devices per `device_id=in.(...)` request, keeps URLs and pages bounded
+DEVICE_BATCH_SIZE = 50
+# Rows per page of history queries, Supabase returns at most 1000
+HISTORY_PAGE_SIZE = 1000
+# Concurrent requests when fetching for large fleets
+MAX_CONCURRENT_REQUESTS = 4
+# Response bodies of at least this many bytes are decoded in an executor,
+# history pages and bulk queries would otherwise block the event loop
+JSON_EXECUTOR_THRESHOLD = 256 * 1024
+
+# Where the latest readings come from: minute averages with all metrics,
+# the realtime table with only the IAQ score, or averages with realtime IAQ
+DATA_SOURCE_AVERAGES = "averages"
+DATA_SOURCE_REALTIME = "realtime"
+DATA_SOURCE_HYBRID = "hybrid"
+DATA_SOURCES = [DATA_SOURCE_AVERAGES, DATA_SOURCE_REALTIME, DATA_SOURCE_HYBRID]
+
+
+# Numeric readings of AmbientOneSensorData
+SENSOR_METRICS = (
+    "pm1_0",
+    "pm2_5",
+    "pm4_0",
+    "pm10_0",
+    "temperature",
+    "humidity",
+    "co2",
+    "voc_index",
+    "nox_index",
+    "iaq_score",
+)
+# Columns of sensor_averages rows that AmbientOneSensorData reads
+SENSOR_COLUMNS = (
+    "device_id",
+    "timestamp",
+    *SENSOR_METRICS,
+    "aqi_category",
+    "primary_pollutant",
+)
+
+
+def decode_json(body: bytes, parse: Callable[[Any], Any] | None = None) -> Any:
+    """Decode a JSON body and build the result from it with `parse`."""
+    data = json.loads(body)
+    return parse(data) if parse is not None else data
+
+
+def sensor_data_rows(rows: list[dict[str, Any]]) -> list[AmbientOneSensorData]:
+    """Build readings from sensor_averages rows."""
+    return [AmbientOneSensorData(row) for row in rows]
+
+
+def batched(device_ids: list[str]) -> list[list[str]]:
+    """Split device IDs into batches for `device_id=in.(...)` requests."""
+    return [
+        device_ids[i : i + DEVICE_BATCH_SIZE]
+        for i in range(0, len(device_ids), DEVICE_BATCH_SIZE)
+    ]
+
+
+class AmbientOneAPIError(Exception):
+    """Base exception for Ambient One API errors."""
+
+
+class AmbientOneAuthError(AmbientOneAPIError):
+    """Authentication error."""
+
+
+class AmbientOneDevice:
+    """Represents an Ambient One device."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        """Initialize device."""
+        self.device_id: str = data["device_id"]
+        self.name: str = data["name"]
+        self.firmware_version: str | None = data.get("firmware_version")
+        self.battery_percentage: int | None = data.get("battery_percentage")
+        self.wifi_rssi: int | None = data.get("wifi_rssi")
+        self.last_seen: str | None = data.get("last_seen")
+        self.location_name: str | None = None
+        if data.get("locations"):
+            self.location_name = data["locations"].get("name")
+        self.space_name: str | None = None
+        if data.get("spaces"):
+            self.space_name = data["spaces"].get("name")
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"<AmbientOneDevice {self.name} ({self.device_id})>"
+
+
+class AmbientOneSensorData:
+    """Represents sensor readings from an Ambient One device."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        """Initialize sensor data."""
+        self.device_id: str | None = data.get("device_id")
+        self.timestamp: str = data.get("timestamp")
+        self.pm1_0: float | None = data.get("pm1_0")
+        self.pm2_5: float | None = data.get("pm2_5")
+        self.pm4_0: float | None = data.get("pm4_0")
+        self.pm10_0: float | None = data.get("pm10_0")
+        self.temperature: float | None = data.get("temperature")
+        self.humidity: float | None = data.get("humidity")
+        self.co2: int | None = data.get("co2")
+        self.voc_index: int | None = data.get("voc_index")
+        self.nox_index: int | None = data.get("nox_index")
+        self.iaq_score: float | None = data.get("iaq_score")
+        self.aqi_category: str | None = data.get("aqi_category")
+        self.primary_pollutant: str | None = data.get("primary_pollutant")
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"<AmbientOneSensorData {self.device_id} @ {self.timestamp}>"
+
+
+class _InFlightRequest:
+    """A shared GET request and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class AmbientOneClient:
+    """Client for interacting with the Ambient One API via Supabase."""
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        session: aiohttp.ClientSession | None = None,
+        stats: AmbientOneStats | None = None,
+        base_url: str | None = None,
+    ) -> None:
+        """Initialize the API client.
+
+        Pass the same `stats` whose `trace_config()` is attached to `session`
+        to also collect DNS/connect/TTFB timings. `base_url` points the client
+        at another Supabase compatible server, such as the fake or HAR replay
+        servers in `scripts/`. `max_concurrency` limits parallel requests of
+        multi-device fetches and may be changed at any time, so may
+        `json_executor_threshold`, the body size from which responses are
+        decoded in the default executor instead of on the event loop.
+
+        Concurrent GETs of the same URL share one request, all callers get
+        the same decoded objects and must not modify them.
+        """
+        self.email = email
+        self.password = password
+        self._session = session
+        self._own_session = session is None
+        self.stats = stats or AmbientOneStats()
+        self._access_token: str | None = None
+        self._refresh_token: str | None = None
+        self._token_expires_at: datetime | None = None
+        self._user_id: str | None = None
+        self.max_concurrency = MAX_CONCURRENT_REQUESTS
+        self.json_executor_threshold = JSON_EXECUTOR_THRESHOLD
+        # sensor_averages columns to request, None for all of them
+        self.sensor_columns: tuple[str, ...] | None = None
+        # (URL, user ID, parse) of GETs in flight to the shared request
+        self._in_flight: dict[tuple[str, str | None, Any], _InFlightRequest] = {}
+
+        # Supabase configuration
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.anon_key = (
+            "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."
+            "eyJpc3MiOiJzdXBhYmFzZSIsInJlZiI6ImNzemx6a3dycHVnZG5jZXhqa2JkIiwicm9sZSI6ImFub24iLCJpYXQiOjE3NDQ4MzM1ODYsImV4cCI6MjA2MDQwOTU4Nn0."
+            "8hurRr4Pk_oc4utH4Nce8B8GHTgU6m3VaBtTobRDGXs"
+        )
+
+    async def __aenter__(self) -> AmbientOneClient:
+        """Async context manager entry."""
+        if self._own_session:
+            self._session = self._create_session()
+        await self.authenticate()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """Async context manager exit."""
+        if self._own_session and self._session:
+            await self._session.close()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create an instrumented session owned by the client."""
+        return aiohttp.ClientSession(trace_configs=[self.stats.trace_config()])
+
+    def _get_headers(self, use_auth: bool = True) -> dict[str, str]:
+        """Get request headers."""
+        headers = {
+            "apikey": self.anon_key,
+            "Content-Type": "application/json",
+        }
+        if use_auth and self._access_token:
+            headers["Authorization"] = f"Bearer {self._access_token}"
+        return headers
+
+    async def _ensure_token_valid(self) -> None:
+        """Ensure the access token is valid, refresh if needed."""
+        if not self._access_token:
+            await self.authenticate()
+            return
+
+        if self._token_expires_at and datetime.now() >= self._token_expires_at - timedelta(minutes=5):
+            await self._refresh_access_token()
+
+    async def _refresh_access_token(self) -> None:
+        """Refresh the access token using the refresh token."""
+        if not self._refresh_token:
+            await self.authenticate()
+            return
+
+        url = f"{self.base_url}/auth/v1/token?grant_type=refresh_token"
+        payload = {"refresh_token": self._refresh_token}
+
+        started = time.monotonic()
+        body = b""
+        status: int | None = None
+        error = True
+        try:
+            async with self._session.post(
+                url,
+                json=payload,
+                headers=self._get_headers(use_auth=False),
+                trace_request_ctx={"endpoint": "auth"},
+            ) as response:
+                status = response.status
+                body = await response.read()
+                if response.status == 200:
+                    data = json.loads(body)
+                    self._access_token = data["access_token"]
+                    self._refresh_token = data.get("refresh_token", self._refresh_token)
+                    self._token_expires_at = datetime.now() + timedelta(
+                        seconds=data["expires_in"]
+                    )
+                    self._user_id = data["user"]["id"]
+                    error = False
+                else:
+                    raise AmbientOneAuthError("Failed to refresh access token")
+        finally:
+            self.stats.record_request(
+                "auth", time.monotonic() - started, len(body), error, status
+            )
+            self.stats.record_token_event("refresh_token", not error)
+
+    async def authenticate(self) -> None:
+        """Authenticate with email and password."""
+        url = f"{self.base_url}/auth/v1/token?grant_type=password"
+        payload = {"email": self.email, "password": self.password}
+
+        if not self._session:
+            self._session = self._create_session()
+
+        started = time.monotonic()
+        body = b""
+        status: int | None = None
+        error = True
+        try:
+            async with self._session.post(
+                url,
+                json=payload,
+                headers=self._get_headers(use_auth=False),
+                trace_request_ctx={"endpoint": "auth"},
+            ) as response:
+                status = response.status
+                body = await response.read()
+                if response.status == 200:
+                    data = json.loads(body)
+                    self._access_token = data["access_token"]
+                    self._refresh_token = data["refresh_token"]
+                    self._token_expires_at = datetime.now() + timedelta(
+                        seconds=data["expires_in"]
+                    )
+                    self._user_id = data["user"]["id"]
+                    error = False
+                    _LOGGER.debug("Successfully authenticated with Ambient One API")
+                else:
+                    error_text = body.decode(errors="replace")
+                    raise AmbientOneAuthError(
+                        f"Authentication failed: {response.status} - {error_text}"
+                    )
+        except aiohttp.ClientError as err:
+            raise AmbientOneAPIError(f"Network error during authentication: {err}")
+        finally:
+            self.stats.record_request(
+                "auth", time.monotonic() - started, len(body), error, status
+            )
+            self.stats.record_token_event("password", not error)
+
+    async def _decode(
+        self, endpoint: str, body: bytes, parse: Callable[[Any], Any] | None
+    ) -> Any:
+        """Decode a response body, large ones in the default executor."""
+        started = time.monotonic()
+        offload = len(body) >= self.json_executor_threshold
+        if offload:
+            data = await asyncio.get_running_loop().run_in_executor(
+                None, decode_json, body, parse
+            )
+        else:
+            data = decode_json(body, parse)
+        self.stats.record_decode(endpoint, time.monotonic() - started, offload)
+        return data
+
+    async def _get(
+        self,
+        endpoint: str,
+        url: str,
+        what: str,
+        parse: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """GET a PostgREST URL and return the decoded JSON body.
+
+        While a GET of the same URL for the same user and with the same
+        `parse` is in flight, no new request is made and its result is
+        returned instead. It keeps running when the caller that started it
+        is cancelled, so the others still get it, and is cancelled once no
+        caller waits for it any more.
+
+        Args:
+            endpoint: Name the request is recorded under in the stats
+            url: Full request URL
+            what: Description used in error messages
+            parse: Builds the result from the decoded JSON, together with
+                   decoding it runs in an executor for large bodies
+        """
+        key = (url, self._user_id, parse)
+        if (request := self._in_flight.get(key)) is not None:
+            self.stats.record_coalesced(endpoint)
+        else:
+            request = self._in_flight[key] = _InFlightRequest(
+                asyncio.ensure_future(self._request(endpoint, url, what, parse))
+            )
+            request.task.add_done_callback(partial(self._request_done, key))
+
+        request.waiters += 1
+        try:
+            return await asyncio.shield(request.task)
+        finally:
+            request.waiters -= 1
+            # Nobody waits for it any more, e.g. after all callers timed out
+            if not request.waiters and not request.task.done():
+                request.task.cancel()
+                if self._in_flight.get(key) is request:
+                    del self._in_flight[key]
+
+    def _request_done(
+        self, key: tuple[str, str | None, Any], task: asyncio.Task[Any]
+    ) -> None:
+        """Forget a finished shared request."""
+        if (request := self._in_flight.get(key)) is not None and request.task is task:
+            del self._in_flight[key]
+        # Retrieve the exception, the callers may all have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _request(
+        self,
+        endpoint: str,
+        url: str,
+        what: str,
+        parse: Callable[[Any], Any] | None,
+    ) -> Any:
+        """Do a GET request, see `_get`."""
+        started = time.monotonic()
+        body = b""
+        status: int | None = None
+        error = True
+        try:
+            async with self._session.get(
+                url,
+                headers=self._get_headers(),
+                trace_request_ctx={"endpoint": endpoint},
+            ) as response:
+                status = response.status
+                body = await response.read()
+                if response.status == 200:
+                    data = await self._decode(endpoint, body, parse)
+                    error = False
+                    return data
+                else:
+                    error_text = body.decode(errors="replace")
+                    raise AmbientOneAPIError(
+                        f"Failed to get {what}: {response.status} - {error_text}"
+                    )
+        except aiohttp.ClientError as err:
+            raise AmbientOneAPIError(f"Network error getting {what}: {err}")
+        finally:
+            self.stats.record_request(
+                endpoint, time.monotonic() - started, len(body), error, status
+            )
+
+    async def get_devices(self) -> list[AmbientOneDevice]:
+        """Get list of devices for the authenticated user."""
+        await self._ensure_token_valid()
+
+        url = (
+            f"{self.base_url}/rest/v1/devices?"
+            f"select=device_id,name,last_seen,firmware_version,space_id,location_id,"
+            f"battery_percentage,wifi_rssi,organization_id,user_id,"
+            f"spaces!devices_space_id_fkey(name),"
+            f"locations!devices_location_id_fkey(name)"
+            f"&user_id=eq.{self._user_id}"
+            f"&order=last_seen.desc.nullslast"
+        )
+
+        data = await self._get("devices", url, "devices")
+        return [AmbientOneDevice(device) for device in data]
+
+    def _sensor_select(self) -> str:
+        """Return the select= value for sensor_averages rows."""
+        if self.sensor_columns is None:
+            return "*"
+        columns = {"device_id", "timestamp", *self.sensor_columns}
+        return ",".join(column for column in SENSOR_COLUMNS if column in columns)
+
+    async def get_sensor_data(
+        self, device_id: str, realtime: bool = False
+    ) -> AmbientOneSensorData | None:
+        """Get sensor data for a device.
+
+        Args:
+            device_id: The device ID
+            realtime: If True, get only IAQ score from realtime table.
+                     If False, get full sensor data from latest sensor_averages.
+        """
+        await self._ensure_token_valid()
+
+        if realtime:
+            endpoint = "sensor_realtime"
+            # Get just the IAQ score from realtime table
+            url = (
+                f"{self.base_url}/rest/v1/sensor_realtime?"
+                f"select=device_id,iaq_score,timestamp"
+                f"&device_id=eq.{device_id}"
+            )
+        else:
+            endpoint = "sensor_averages"
+            # Get full sensor data from averages (last 5 minutes)
+            url = (
+                f"{self.base_url}/rest/v1/sensor_averages?"
+                f"select={self._sensor_select()}"
+                f"&device_id=eq.{device_id}"
+                f"&aggregation_type=eq.minute"
+                f"&order=timestamp.desc"
+                f"&limit=1"
+            )
+
+        data = await self._get(endpoint, url, "sensor data")
+        if data:
+            return AmbientOneSensorData(data[0])
+        return None
+
+    async def get_all_device_data(
+        self, data_source: str = DATA_SOURCE_AVERAGES
+    ) -> dict[str, dict[str, Any]]:
+        """Get all devices with their latest sensor data.
+
+        Returns a dict keyed by device ID with the `device` and its
+        `sensor_data`, the shape the Home Assistant coordinator exposes.
+        Averages are fetched per device with up to `max_concurrency`
+        requests at once, realtime IAQ scores in bulk.
+
+        Args:
+            data_source: One of DATA_SOURCES. With DATA_SOURCE_REALTIME the
+                         sensor data only holds the IAQ score, with
+                         DATA_SOURCE_HYBRID the averages get the realtime
+                         IAQ score.
+        """
+        devices = await self.get_devices()
+        device_ids = [device.device_id for device in devices]
+
+        async def fetch_averages() -> list[AmbientOneSensorData | None]:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def fetch(device_id: str) -> AmbientOneSensorData | None:
+                async with semaphore:
+                    return await self.get_sensor_data(device_id)
+
+            return await asyncio.gather(*(fetch(device_id) for device_id in device_ids))
+
+        averages: list[AmbientOneSensorData | None] = [None] * len(devices)
+        realtime: dict[str, tuple[float | None, str | None]] = {}
+        if data_source == DATA_SOURCE_AVERAGES:
+            averages = await fetch_averages()
+        elif data_source == DATA_SOURCE_REALTIME:
+            realtime = await self.get_realtime_iaq(device_ids)
+        else:
+            averages, realtime = await asyncio.gather(
+                fetch_averages(), self.get_realtime_iaq(device_ids)
+            )
+
+        device_data: dict[str, dict[str, Any]] = {}
+        for device, sensor_data in zip(devices, averages):
+            if device.device_id in realtime:
+                iaq_score, timestamp = realtime[device.device_id]
+                if sensor_data is None:
+                    sensor_data = AmbientOneSensorData(
+                        {
+                            "device_id": device.device_id,
+                            "iaq_score": iaq_score,
+                            "timestamp": timestamp,
+                        }
+                    )
+                else:
+                    sensor_data.iaq_score = iaq_score
+            device_data[device.device_id] = {
+                "device": device,
+                "sensor_data": sensor_data,
+            }
+
+        return device_data
+
+    async def get_realtime_iaq(
+        self, device_ids: list[str]
+    ) -> dict[str, tuple[float | None, str | None]]:
+        """Get the realtime IAQ score of many devices at once.
+
+        Devices are queried in batches of DEVICE_BATCH_SIZE, so a fleet costs
+        one request per batch instead of one per device. Returns
+        `{device_id: (iaq_score, timestamp)}`, devices without a realtime
+        row are missing.
+        """
+        await self._ensure_token_valid()
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_batch(batch: list[str]) -> list[dict[str, Any]]:
+            url = (
+                f"{self.base_url}/rest/v1/sensor_realtime?"
+                f"select=device_id,iaq_score,timestamp"
+                f"&device_id=in.({','.join(batch)})"
+                f"&order=timestamp.desc"
+            )
+            async with semaphore:
+                return await self._get("sensor_realtime", url, "realtime data")
+
+        results = await asyncio.gather(
+            *(fetch_batch(batch) for batch in batched(device_ids))
+        )
+
+        iaq: dict[str, tuple[float | None, str | None]] = {}
+        for rows in results:
+            # Newest first, keep the first row per device
+            for row in rows:
+                if row.get("device_id") not in iaq:
+                    iaq[row["device_id"]] = (row.get("iaq_score"), row.get("timestamp"))
+        return iaq
+
+    async def get_latest_sensor_data(
+        self,
+        device_ids: list[str],
+        window: timedelta = timedelta(minutes=5),
+    ) -> dict[str, AmbientOneSensorData]:
+        """Get the latest minute averages for many devices at once.
+
+        Devices are queried in batches of DEVICE_BATCH_SIZE, only rows from
+        the last `window` are requested. Devices without a row in that window
+        are missing from the result.
+        """
+        await self._ensure_token_valid()
+
+        since = quote((datetime.now(timezone.utc) - window).isoformat())
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_batch(batch: list[str]) -> list[AmbientOneSensorData]:
+            url = (
+                f"{self.base_url}/rest/v1/sensor_averages?"
+                f"select={self._sensor_select()}"
+                f"&device_id=in.({','.join(batch)})"
+                f"&aggregation_type=eq.minute"
+                f"&timestamp=gte.{since}"
+                f"&order=timestamp.desc"
+            )
+            async with semaphore:
+                return await self._get(
+                    "sensor_averages", url, "sensor data", sensor_data_rows
+                )
+
+        results = await asyncio.gather(
+            *(fetch_batch(batch) for batch in batched(device_ids))
+        )
+
+        latest: dict[str, AmbientOneSensorData] = {}
+        for readings in results:
+            # Rows are newest first, keep the first one per device
+            for reading in readings:
+                if reading.device_id not in latest:
+                    latest[reading.device_id] = reading
+        return latest
+
+    async def get_sensor_history(
+        self,
+        device_ids: list[str],
+        start: datetime,
+        end: datetime,
+        aggregation: str = "minute",
+    ) -> list[AmbientOneSensorData]:
+        """Get all averages of several devices in a time range.
+
+        Returns the rows with `start <= timestamp < end`, oldest first. Each
+        batch of DEVICE_BATCH_SIZE devices is one range query, paged by
+        HISTORY_PAGE_SIZE rows.
+        """
+        await self._ensure_token_valid()
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_batch(batch: list[str]) -> list[AmbientOneSensorData]:
+            base_url = (
+                f"{self.base_url}/rest/v1/sensor_averages?"
+                f"select={self._sensor_select()}"
+                f"&device_id=in.({','.join(batch)})"
+                f"&aggregation_type=eq.{aggregation}"
+                f"&timestamp=gte.{quote(start.isoformat())}"
+                f"&timestamp=lt.{quote(end.isoformat())}"
+                f"&order=timestamp.asc,device_id.asc"
+                f"&limit={HISTORY_PAGE_SIZE}"
+            )
+            rows: list[AmbientOneSensorData] = []
+            async with semaphore:
+                while True:
+                    page = await self._get(
+                        "sensor_averages",
+                        f"{base_url}&offset={len(rows)}",
+                        "sensor history",
+                        sensor_data_rows,
+                    )
+                    rows.extend(page)
+                    if len(page) < HISTORY_PAGE_SIZE:
+                        return rows
+
+        results = await asyncio.gather(
+            *(fetch_batch(batch) for batch in batched(device_ids))
+        )
+
+        history = [reading for rows in results for reading in rows]
+        history.sort(key=lambda data: data.timestamp)
+        return history
+
+    async def stream_readings(
+        self,
+        device_ids: list[str],
+        interval: float = 60,
+    ) -> AsyncIterator[AmbientOneSensorData]:
+        """Yield new readings for the given devices as they arrive.
+
+        Every `interval` seconds the latest readings of all devices are
+        fetched in batches, and only readings with a timestamp that was not
+        yielded before are passed on. The next fetch only starts once the
+        consumer has taken all readings of the previous one, so a slow
+        consumer delays polling instead of piling up readings in memory.
+
+            async with AmbientOneClient(email, password) as client:
+                async for reading in client.stream_readings(device_ids):
+                    print(reading.device_id, reading.co2)
+        """
+        loop = asyncio.get_running_loop()
+        last_timestamps: dict[str, str] = {}
+
+        while True:
+            started = loop.time()
+
+            try:
+                readings = await self.get_latest_sensor_data(device_ids)
+            except AmbientOneAuthError:
+                raise
+            except AmbientOneAPIError as err:
+                _LOGGER.warning("Failed to fetch readings, retrying: %s", err)
+                readings = {}
+
+            for device_id, reading in readings.items():
+                if last_timestamps.get(device_id) == reading.timestamp:
+                    continue
+                last_timestamps[device_id] = reading.timestamp
+                yield reading
+
+            await asyncio.sleep(max(0, interval - (loop.time() - started)))
+
+    async def get_device_events(
+        self, device_id: str, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """Get recent air quality events for a device."""
+        await self._ensure_token_valid()
+
+        url = (
+            f"{self.base_url}/rest/v1/device_events?"
+            f"select=*"
+            f"&device_id=eq.{device_id}"
+            f"&order=timestamp.desc"
+            f"&limit={limit}"
+        )
+
+        return await self._get("device_events", url, "device events")
+
+    async def get_events_since(
+        self,
+        device_ids: list[str],
+        since: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Get air quality events for several devices in one request.
+
+        Args:
+            device_ids: Devices to fetch events for, at most
+                        DEVICE_BATCH_SIZE to keep the URL short
+            since: Only return events with a timestamp after this one.
+                   If None, only the newest event is returned.
+            limit: Maximum number of events to return, oldest first.
+            offset: Events to skip, for paging. Events are ordered by
+                    timestamp and ID, so pages do not split or repeat
+                    events that share a timestamp.
+        """
+        await self._ensure_token_valid()
+
+        url = (
+            f"{self.base_url}/rest/v1/device_events?"
+            f"select=*"
+            f"&device_id=in.({','.join(device_ids)})"
+        )
+        if since is None:
+            url += "&order=timestamp.desc&limit=1"
+        else:
+            url += (
+                f"&timestamp=gt.{quote(since)}"
+                f"&order=timestamp.asc,id.asc"
+                f"&limit={limit}&offset={offset}"
+            )
+
+        return await self._get("device_events", url, "device events")
@@ -0,0 +1,233 @@
+"""Incremental hour and day aggregates of Ambient One readings."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from .api import SENSOR_METRICS, AmbientOneSensorData
+
+AGGREGATION_HOUR = "hour"
+AGGREGATION_DAY = "day"
+
+
+def _hour_start(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def _day_start(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# Bucket start of a UTC timestamp per aggregation level
+BUCKET_STARTS: dict[str, Callable[[datetime], datetime]] = {
+    AGGREGATION_HOUR: _hour_start,
+    AGGREGATION_DAY: _day_start,
+}
+# Minute readings in a complete bucket per aggregation level
+BUCKET_MINUTES: dict[str, int] = {
+    AGGREGATION_HOUR: 60,
+    AGGREGATION_DAY: 1440,
+}
+
+
+def parse_timestamp(timestamp: str | None) -> datetime | None:
+    """Parse a reading timestamp to an aware UTC datetime."""
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class MetricStats:
+    """Running count, mean, min and max of one metric."""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def add(self, value: float) -> None:
+        """Fold in one value."""
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the values."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dict."""
+        return {"mean": self.mean, "min": self.min, "max": self.max, "count": self.count}
+
+
+class AggregateBucket:
+    """Per-metric statistics of the readings in one time bucket."""
+
+    __slots__ = ("start", "minutes", "readings", "metrics")
+
+    def __init__(self, start: datetime, minutes: int) -> None:
+        """Initialize an empty bucket spanning `minutes` minute readings."""
+        self.start = start
+        self.minutes = minutes
+        self.readings = 0
+        self.metrics: dict[str, MetricStats] = {}
+
+    @property
+    def coverage(self) -> float:
+        """Return the share of the bucket's minutes that have a reading."""
+        return self.readings / self.minutes
+
+    def add(self, reading: AmbientOneSensorData) -> None:
+        """Fold in one reading."""
+        self.readings += 1
+        for metric in SENSOR_METRICS:
+            value = getattr(reading, metric)
+            if value is not None:
+                if metric not in self.metrics:
+                    self.metrics[metric] = MetricStats()
+                self.metrics[metric].add(value)
+
+    def as_sensor_data(self, device_id: str) -> AmbientOneSensorData:
+        """Return the means as a reading, like an aggregated server row."""
+        return AmbientOneSensorData(
+            {
+                "device_id": device_id,
+                "timestamp": self.start.isoformat(),
+                **{metric: stats.mean for metric, stats in self.metrics.items()},
+            }
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the bucket as a dict."""
+        return {
+            "start": self.start.isoformat(),
+            "readings": self.readings,
+            "coverage": round(self.coverage, 3),
+            "metrics": {metric: stats.as_dict() for metric, stats in self.metrics.items()},
+        }
+
+
+class AmbientOneDownsampler:
+    """Fold minute readings into running hour and day buckets.
+
+    Per device and level only the bucket being filled and the last complete
+    one are kept, so memory does not grow with the number of readings. A
+    bucket is complete once a reading of a later bucket arrives. Readings
+    must arrive in timestamp order, repeated or older ones are ignored.
+
+    The aggregates are only exact when every minute is folded in. Minutes
+    that arrive late, like those fetched after an outage, cannot be folded
+    in out of order; `rebuild` replaces a device's buckets from all its
+    readings instead. A bucket's `coverage` tells how many of its minutes
+    it holds, it is below 1 for the first bucket after a restart and when
+    polling less often than once a minute.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the downsampler."""
+        self._last: dict[str, datetime] = {}
+        self._current: dict[tuple[str, str], AggregateBucket] = {}
+        self._complete: dict[tuple[str, str], AggregateBucket] = {}
+
+    def add(self, reading: AmbientOneSensorData) -> list[tuple[str, AggregateBucket]]:
+        """Fold in a reading, return the (level, bucket) pairs it completed."""
+        device_id = reading.device_id
+        timestamp = parse_timestamp(reading.timestamp)
+        if device_id is None or timestamp is None:
+            return []
+        last = self._last.get(device_id)
+        if last is not None and timestamp <= last:
+            return []
+        self._last[device_id] = timestamp
+
+        completed = []
+        for level, bucket_start in BUCKET_STARTS.items():
+            key = (device_id, level)
+            start = bucket_start(timestamp)
+            bucket = self._current.get(key)
+            if bucket is None or bucket.start != start:
+                if bucket is not None:
+                    self._complete[key] = bucket
+                    completed.append((level, bucket))
+                bucket = self._current[key] = AggregateBucket(start, BUCKET_MINUTES[level])
+            bucket.add(reading)
+        return completed
+
+    def add_many(
+        self, readings: Iterable[AmbientOneSensorData]
+    ) -> list[tuple[str, AggregateBucket]]:
+        """Fold in readings, oldest first."""
+        completed = []
+        for reading in sorted(readings, key=lambda reading: reading.timestamp or ""):
+            completed.extend(self.add(reading))
+        return completed
+
+    def rebuild(
+        self, device_id: str, readings: Iterable[AmbientOneSensorData]
+    ) -> list[tuple[str, AggregateBucket]]:
+        """Replace the buckets of a device with ones built from its readings."""
+        self._last.pop(device_id, None)
+        for level in BUCKET_STARTS:
+            self._current.pop((device_id, level), None)
+            self._complete.pop((device_id, level), None)
+        return self.add_many(readings)
+
+    def last_timestamp(self, device_id: str) -> datetime | None:
+        """Return the timestamp of the newest reading folded in for a device."""
+        return self._last.get(device_id)
+
+    def current(self, device_id: str, level: str) -> AggregateBucket | None:
+        """Return the bucket that is still being filled."""
+        return self._current.get((device_id, level))
+
+    def complete(self, device_id: str, level: str) -> AggregateBucket | None:
+        """Return the last complete bucket."""
+        return self._complete.get((device_id, level))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all buckets per device and level."""
+        result: dict[str, Any] = {}
+        for (device_id, level), bucket in self._current.items():
+            complete = self._complete.get((device_id, level))
+            result.setdefault(device_id, {})[level] = {
+                "current": bucket.as_dict(),
+                "complete": complete.as_dict() if complete else None,
+            }
+        return result
+
+
+def aggregate_history(
+    readings: Iterable[AmbientOneSensorData], level: str = AGGREGATION_HOUR
+) -> dict[str, list[AggregateBucket]]:
+    """Aggregate minute readings, e.g. from get_sensor_history, per device.
+
+    Returns the buckets of every device oldest first. The first and last
+    bucket only cover part of their hour or day unless the readings span
+    whole buckets.
+    """
+    bucket_start = BUCKET_STARTS[level]
+    minutes = BUCKET_MINUTES[level]
+    buckets: dict[str, list[AggregateBucket]] = {}
+    for reading in sorted(readings, key=lambda reading: reading.timestamp or ""):
+        timestamp = parse_timestamp(reading.timestamp)
+        if reading.device_id is None or timestamp is None:
+            continue
+        start = bucket_start(timestamp)
+        device_buckets = buckets.setdefault(reading.device_id, [])
+        if not device_buckets or device_buckets[-1].start != start:
+            device_buckets.append(AggregateBucket(start, minutes))
+        device_buckets[-1].add(reading)
+    return buckets
@@ -0,0 +1,244 @@
+"""Prometheus exporter for Ambient One devices.
+
+Usage:
+    AMBIENT_ONE_EMAIL=... AMBIENT_ONE_PASSWORD=... python -m ambient_one.exporter
+
+Readings are refreshed in the background with batched `sensor_averages`
+queries and rendered into a text snapshot once per refresh. `/metrics` only
+returns that snapshot, so scrapes never cause requests to the cloud.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime
+import logging
+import os
+import time
+
+from aiohttp import web
+
+from .api import (
+    AmbientOneAPIError,
+    AmbientOneAuthError,
+    AmbientOneClient,
+    AmbientOneDevice,
+    AmbientOneSensorData,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Reading attribute, metric name, help text
+READING_METRICS: tuple[tuple[str, str, str], ...] = (
+    ("pm1_0", "ambient_one_pm1_0_ugm3", "PM1.0 concentration in µg/m³"),
+    ("pm2_5", "ambient_one_pm2_5_ugm3", "PM2.5 concentration in µg/m³"),
+    ("pm4_0", "ambient_one_pm4_0_ugm3", "PM4.0 concentration in µg/m³"),
+    ("pm10_0", "ambient_one_pm10_ugm3", "PM10 concentration in µg/m³"),
+    ("co2", "ambient_one_co2_ppm", "CO2 concentration in ppm"),
+    ("voc_index", "ambient_one_voc_index", "VOC index"),
+    ("nox_index", "ambient_one_nox_index", "NOx index"),
+    ("temperature", "ambient_one_temperature_celsius", "Temperature in °C"),
+    ("humidity", "ambient_one_humidity_percent", "Relative humidity in %"),
+    ("iaq_score", "ambient_one_iaq_score", "Indoor air quality score (0-10)"),
+)
+
+# Device attribute, metric name, help text
+DEVICE_METRICS: tuple[tuple[str, str, str], ...] = (
+    ("battery_percentage", "ambient_one_battery_percent", "Battery level in %"),
+    ("wifi_rssi", "ambient_one_wifi_rssi_dbm", "WiFi signal strength in dBm"),
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _parse_timestamp(timestamp: str | None) -> float | None:
+    """Return a reading timestamp as Unix time."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return None
+
+
+def render_metrics(
+    devices: list[AmbientOneDevice],
+    readings: dict[str, AmbientOneSensorData],
+    last_refresh: float | None,
+    refresh_errors: int,
+) -> bytes:
+    """Render devices and readings in the Prometheus text format."""
+    labels = {
+        device.device_id: (
+            f'device_id="{_escape(device.device_id)}",name="{_escape(device.name)}"'
+        )
+        for device in devices
+    }
+    lines: list[str] = []
+
+    def family(name: str, help_text: str, kind: str = "gauge") -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for attr, name, help_text in READING_METRICS:
+        family(name, help_text)
+        for device_id, reading in readings.items():
+            value = getattr(reading, attr)
+            if value is not None and device_id in labels:
+                lines.append(f"{name}{{{labels[device_id]}}} {value}")
+
+    family(
+        "ambient_one_reading_timestamp_seconds",
+        "Unix time of the latest reading",
+    )
+    for device_id, reading in readings.items():
+        timestamp = _parse_timestamp(reading.timestamp)
+        if timestamp is not None and device_id in labels:
+            lines.append(
+                f"ambient_one_reading_timestamp_seconds{{{labels[device_id]}}} {timestamp}"
+            )
+
+    for attr, name, help_text in DEVICE_METRICS:
+        family(name, help_text)
+        for device in devices:
+            value = getattr(device, attr)
+            if value is not None:
+                lines.append(f"{name}{{{labels[device.device_id]}}} {value}")
+
+    family(
+        "ambient_one_last_refresh_timestamp_seconds",
+        "Unix time of the last successful refresh",
+    )
+    lines.append(f"ambient_one_last_refresh_timestamp_seconds {last_refresh or 0}")
+    family(
+        "ambient_one_refresh_errors_total",
+        "Failed background refreshes",
+        "counter",
+    )
+    lines.append(f"ambient_one_refresh_errors_total {refresh_errors}")
+
+    return ("\n".join(lines) + "\n").encode()
+
+
+class AmbientOneExporter:
+    """Keep a rendered metrics snapshot refreshed in the background."""
+
+    def __init__(
+        self,
+        client: AmbientOneClient,
+        interval: float = 60,
+        device_refresh_interval: float = 600,
+    ) -> None:
+        """Initialize the exporter."""
+        self.client = client
+        self.interval = interval
+        self.device_refresh_interval = device_refresh_interval
+        self._devices: list[AmbientOneDevice] = []
+        self._devices_fetched_at: float | None = None
+        self._readings: dict[str, AmbientOneSensorData] = {}
+        self._last_refresh: float | None = None
+        self._refresh_errors = 0
+        self._snapshot = render_metrics([], {}, None, 0)
+
+    async def refresh(self) -> None:
+        """Fetch devices (occasionally) and readings, then re-render."""
+        now = time.monotonic()
+        if (
+            self._devices_fetched_at is None
+            or now - self._devices_fetched_at >= self.device_refresh_interval
+        ):
+            self._devices = await self.client.get_devices()
+            self._devices_fetched_at = now
+            known = {device.device_id for device in self._devices}
+            self._readings = {
+                device_id: reading
+                for device_id, reading in self._readings.items()
+                if device_id in known
+            }
+
+        # Devices without a reading in the window keep their last one
+        self._readings.update(
+            await self.client.get_latest_sensor_data(
+                [device.device_id for device in self._devices]
+            )
+        )
+        self._last_refresh = time.time()
+        self._render()
+
+    def _render(self) -> None:
+        """Replace the served snapshot."""
+        self._snapshot = render_metrics(
+            self._devices, self._readings, self._last_refresh, self._refresh_errors
+        )
+
+    async def run(self) -> None:
+        """Refresh forever, keeping the previous snapshot on errors."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.refresh()
+            except AmbientOneAuthError:
+                raise
+            except AmbientOneAPIError as err:
+                _LOGGER.warning("Failed to refresh Ambient One metrics: %s", err)
+                self._refresh_errors += 1
+                self._render()
+            await asyncio.sleep(max(0, self.interval - (loop.time() - started)))
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Serve the current snapshot."""
+        return web.Response(
+            body=self._snapshot, headers={"Content-Type": CONTENT_TYPE}
+        )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Run the exporter until cancelled."""
+    async with AmbientOneClient(args.email, args.password) as client:
+        exporter = AmbientOneExporter(client, interval=args.interval)
+
+        app = web.Application()
+        app.router.add_get("/metrics", exporter.handle_metrics)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, args.host, args.port)
+        await site.start()
+        _LOGGER.info("Serving metrics on http://%s:%s/metrics", args.host, args.port)
+
+        # The first poll happens in run(), until it succeeds the snapshot is empty
+        try:
+            await exporter.run()
+        finally:
+            await runner.cleanup()
+
+
+def main() -> None:
+    """Parse arguments and run the exporter."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--email", default=os.environ.get("AMBIENT_ONE_EMAIL"))
+    parser.add_argument("--password", default=os.environ.get("AMBIENT_ONE_PASSWORD"))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9797)
+    parser.add_argument(
+        "--interval", type=float, default=60, help="Refresh interval in seconds"
+    )
+    args = parser.parse_args()
+
+    if not args.email or not args.password:
+        parser.error("Set --email/--password or AMBIENT_ONE_EMAIL/AMBIENT_ONE_PASSWORD")
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Request instrumentation for the Ambient One API client."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+# Upper bounds in milliseconds, the last bucket catches everything above
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000,
+)
+
+# Update cycles and token events kept for diagnostics
+CYCLE_TRACE_SIZE = 20
+TOKEN_HISTORY_SIZE = 20
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with constant memory."""
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        """Record a single latency in milliseconds."""
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q: float) -> float | None:
+        """Estimate the q-th percentile (0-100) by interpolating in buckets."""
+        if not self.count:
+            return None
+
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+                upper = (
+                    LATENCY_BUCKETS_MS[index]
+                    if index < len(LATENCY_BUCKETS_MS)
+                    else self.max_ms
+                )
+                upper = min(upper, self.max_ms)
+                fraction = (rank - seen) / bucket_count
+                return round(lower + (upper - lower) * fraction, 1)
+            seen += bucket_count
+        return round(self.max_ms, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary of the histogram."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(
+                zip([*map(str, LATENCY_BUCKETS_MS), "+Inf"], self.counts)
+            ),
+        }
+
+
+class EndpointStats:
+    """Counters for a single API endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+        self.dns = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        # Time the event loop spent decoding bodies, offloaded ones excluded
+        self.decode_blocking = LatencyHistogram()
+        self.decodes_offloaded = 0
+        # Requests saved by sharing an identical one in flight
+        self.coalesced = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.as_dict(),
+            "dns": self.dns.as_dict(),
+            "connect": self.connect.as_dict(),
+            "ttfb": self.ttfb.as_dict(),
+            "decode_blocking": self.decode_blocking.as_dict(),
+            "decodes_offloaded": self.decodes_offloaded,
+            "coalesced": self.coalesced,
+        }
+
+
+class AmbientOneStats:
+    """Collect request and update cycle statistics for a client.
+
+    Request counts, errors, bytes and total latency are recorded by the
+    client itself. DNS, connect and time-to-first-byte timings need the
+    aiohttp trace config from `trace_config()` attached to the session.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.endpoints: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.cycles = LatencyHistogram()
+        self.last_cycle_ms: float | None = None
+        self.started = time.monotonic()
+        # Requests per minute over the last hour, indexed by minute % 60
+        self._minute_slots = [0] * 60
+        self._slot_minutes = [0] * 60
+        # Poll trace for diagnostics
+        self.cycle_trace: deque[dict[str, Any]] = deque(maxlen=CYCLE_TRACE_SIZE)
+        self.token_history: deque[dict[str, Any]] = deque(maxlen=TOKEN_HISTORY_SIZE)
+        self._current_cycle: dict[str, Any] | None = None
+        self._cycle_started: float | None = None
+
+    def record_request(
+        self,
+        endpoint: str,
+        duration: float,
+        bytes_received: int = 0,
+        error: bool = False,
+        status: int | None = None,
+    ) -> None:
+        """Record a finished request, duration in seconds."""
+        if self._current_cycle is not None and self._cycle_started is not None:
+            self._current_cycle["requests"].append(
+                {
+                    "endpoint": endpoint,
+                    "offset_ms": round(
+                        (time.monotonic() - duration - self._cycle_started) * 1000, 1
+                    ),
+                    "duration_ms": round(duration * 1000, 1),
+                    "bytes": bytes_received,
+                    "status": status,
+                    "error": error,
+                }
+            )
+
+        stats = self.endpoints[endpoint]
+        stats.requests += 1
+        stats.bytes_received += bytes_received
+        stats.latency.observe(duration * 1000)
+        if error:
+            stats.errors += 1
+
+        minute = int(time.monotonic() // 60)
+        slot = minute % 60
+        if self._slot_minutes[slot] != minute:
+            self._slot_minutes[slot] = minute
+            self._minute_slots[slot] = 0
+        self._minute_slots[slot] += 1
+
+    def record_decode(self, endpoint: str, duration: float, offloaded: bool) -> None:
+        """Record decoding a response body, duration in seconds."""
+        stats = self.endpoints[endpoint]
+        if offloaded:
+            stats.decodes_offloaded += 1
+        else:
+            stats.decode_blocking.observe(duration * 1000)
+
+    def record_coalesced(self, endpoint: str) -> None:
+        """Count a request that was saved by sharing one in flight."""
+        self.endpoints[endpoint].coalesced += 1
+
+    def start_cycle(self) -> None:
+        """Start tracing a coordinator update cycle."""
+        self._cycle_started = time.monotonic()
+        self._current_cycle = {
+            "started": _utcnow_iso(),
+            "requests": [],
+            "state_writes": 0,
+        }
+
+    def record_cycle(
+        self,
+        duration: float,
+        error: str | None = None,
+        data_age: dict[str, float | None] | None = None,
+    ) -> None:
+        """Record the duration of a coordinator update cycle in seconds.
+
+        Args:
+            duration: Cycle duration in seconds
+            error: Error that failed the cycle, if any
+            data_age: Seconds between each device's reading and now
+        """
+        self.last_cycle_ms = round(duration * 1000, 1)
+        self.cycles.observe(duration * 1000)
+
+        if self._current_cycle is not None:
+            self._current_cycle["duration_ms"] = self.last_cycle_ms
+            self._current_cycle["error"] = error
+            self._current_cycle["data_age_s"] = data_age or {}
+            self.cycle_trace.append(self._current_cycle)
+            self._current_cycle = None
+
+    def record_state_write(self) -> None:
+        """Count an entity state write caused by the last cycle."""
+        if self.cycle_trace:
+            self.cycle_trace[-1]["state_writes"] += 1
+
+    def record_token_event(self, grant_type: str, success: bool) -> None:
+        """Record a login or token refresh."""
+        self.token_history.append(
+            {"time": _utcnow_iso(), "grant_type": grant_type, "success": success}
+        )
+
+    @property
+    def requests_last_hour(self) -> int:
+        """Return the number of requests in the last 60 minutes."""
+        minute = int(time.monotonic() // 60)
+        return sum(
+            count
+            for count, slot_minute in zip(self._minute_slots, self._slot_minutes)
+            if minute - slot_minute < 60
+        )
+
+    def latency_percentile(self, q: float) -> float | None:
+        """Return a latency percentile across all endpoints."""
+        combined = LatencyHistogram()
+        for stats in self.endpoints.values():
+            histogram = stats.latency
+            for index, count in enumerate(histogram.counts):
+                combined.counts[index] += count
+            combined.count += histogram.count
+            combined.sum_ms += histogram.sum_ms
+            combined.max_ms = max(combined.max_ms, histogram.max_ms)
+        return combined.percentile(q)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot of all statistics."""
+        return {
+            "uptime_s": round(time.monotonic() - self.started),
+            "requests_last_hour": self.requests_last_hour,
+            "latency_p95_ms": self.latency_percentile(95),
+            "last_cycle_ms": self.last_cycle_ms,
+            "requests_saved": sum(stats.coalesced for stats in self.endpoints.values()),
+            "cycles": self.cycles.as_dict(),
+            "endpoints": {
+                endpoint: stats.as_dict()
+                for endpoint, stats in sorted(self.endpoints.items())
+            },
+        }
+
+    def trace(self) -> dict[str, Any]:
+        """Return the poll trace for diagnostics."""
+        return {
+            "cycles": list(self.cycle_trace),
+            "token_history": list(self.token_history),
+        }
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return an aiohttp trace config feeding DNS/connect/TTFB timings.
+
+        Requests are attributed to the endpoint given as `endpoint` in their
+        `trace_request_ctx`.
+        """
+
+        def _endpoint(ctx: SimpleNamespace) -> str | None:
+            request_ctx = ctx.trace_request_ctx
+            if isinstance(request_ctx, dict):
+                return request_ctx.get("endpoint")
+            return None
+
+        async def on_request_start(session, ctx, params) -> None:
+            ctx.request_start = time.monotonic()
+
+        async def on_dns_resolvehost_start(session, ctx, params) -> None:
+            ctx.dns_start = time.monotonic()
+
+        async def on_dns_resolvehost_end(session, ctx, params) -> None:
+            if (endpoint := _endpoint(ctx)) and hasattr(ctx, "dns_start"):
+                self.endpoints[endpoint].dns.observe(
+                    (time.monotonic() - ctx.dns_start) * 1000
+                )
+
+        async def on_connection_create_start(session, ctx, params) -> None:
+            ctx.connect_start = time.monotonic()
+
+        async def on_connection_create_end(session, ctx, params) -> None:
+            if (endpoint := _endpoint(ctx)) and hasattr(ctx, "connect_start"):
+                self.endpoints[endpoint].connect.observe(
+                    (time.monotonic() - ctx.connect_start) * 1000
+                )
+
+        async def on_request_end(session, ctx, params) -> None:
+            if (endpoint := _endpoint(ctx)) and hasattr(ctx, "request_start"):
+                self.endpoints[endpoint].ttfb.observe(
+                    (time.monotonic() - ctx.request_start) * 1000
+                )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+
+def _utcnow_iso() -> str:
+    """Return the current UTC time in ISO format."""
+    return datetime.now(timezone.utc).isoformat()
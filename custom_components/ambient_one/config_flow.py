@@ -8,11 +8,32 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv, selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import AmbientOneAPIError, AmbientOneAuthError, AmbientOneClient
-from .const import DOMAIN
+from .alerts import ALERTS_SCHEMA, DEFAULT_ALERTS
+from .client.api import (
+    DATA_SOURCE_AVERAGES,
+    DATA_SOURCES,
+    MAX_CONCURRENT_REQUESTS,
+    AmbientOneAPIError,
+    AmbientOneAuthError,
+    AmbientOneClient,
+)
+from .const import (
+    CONF_ALERTS,
+    CONF_DATA_SOURCE,
+    CONF_MAX_CONCURRENCY,
+    CONF_SCAN_INTERVAL,
+    CONF_SENSORS,
+    CONF_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    DOMAIN,
+    SCAN_INTERVAL_SECONDS,
+)
+from .sensor import SENSOR_TYPES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +50,14 @@ class AmbientOneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AmbientOneOptionsFlow:
+        """Get the options flow for this handler."""
+        return AmbientOneOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -57,6 +86,8 @@ class AmbientOneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return self.async_create_entry(
                     title=f"Ambient One ({email})",
                     data=user_input,
+                    # Existing entries keep no alerts until they add some
+                    options={CONF_ALERTS: [dict(alert) for alert in DEFAULT_ALERTS]},
                 )
 
             except AmbientOneAuthError:
@@ -73,3 +104,61 @@ class AmbientOneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
+
+
+class AmbientOneOptionsFlow(config_entries.OptionsFlow):
+    """Handle polling, sensor and alert options for an Ambient One entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                user_input[CONF_ALERTS] = ALERTS_SCHEMA(user_input.get(CONF_ALERTS, []))
+            except vol.Invalid as err:
+                _LOGGER.debug("Invalid alerts: %s", err)
+                errors[CONF_ALERTS] = "invalid_alerts"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = {**self.config_entry.options, **(user_input or {})}
+        sensors = {description.key: description.name for description in SENSOR_TYPES}
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL_SECONDS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                    vol.Required(
+                        CONF_TIMEOUT,
+                        default=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                    vol.Required(
+                        CONF_MAX_CONCURRENCY,
+                        default=options.get(CONF_MAX_CONCURRENCY, MAX_CONCURRENT_REQUESTS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_DATA_SOURCE,
+                        default=options.get(CONF_DATA_SOURCE, DATA_SOURCE_AVERAGES),
+                    ): vol.In(DATA_SOURCES),
+                    vol.Required(
+                        CONF_SENSORS,
+                        default=options.get(CONF_SENSORS, list(sensors)),
+                    ): cv.multi_select(sensors),
+                    vol.Optional(
+                        CONF_ALERTS,
+                        default=options.get(CONF_ALERTS, []),
+                    ): selector.ObjectSelector(),
+                }
+            ),
+            errors=errors,
+        )
@@ -2,14 +2,39 @@
 from homeassistant.const import Platform
 
 DOMAIN = "ambient_one"
-PLATFORMS = [Platform.SENSOR, Platform.AIR_QUALITY]
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.AIR_QUALITY]
+
+MANUFACTURER = "Ambient Works"
+MODEL = "Ambient One"
 
 # Configuration keys
 CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
+# Not offered in the UI, lets tests point an entry at a local server
+CONF_BASE_URL = "base_url"
+
+# Options
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_TIMEOUT = "timeout"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_DATA_SOURCE = "data_source"
+CONF_SENSORS = "sensors"
+CONF_ALERTS = "alerts"
 
 # Update intervals
 SCAN_INTERVAL_SECONDS = 60  # Poll every 60 seconds
+DEFAULT_TIMEOUT = 30
+
+# Options signal, sent with the entry ID when the options changed
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+
+# Services
+SERVICE_PROFILE = "profile"
+ATTR_CYCLES = "cycles"
+
+# Events
+EVENT_AMBIENT_ONE = "ambient_one_event"
+EVENT_AMBIENT_ONE_ALERT = "ambient_one_alert"
 
 # Device attributes
 ATTR_DEVICE_ID = "device_id"
@@ -0,0 +1,273 @@
+"""Data update coordinator for Ambient One."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from datetime import timedelta
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+import async_timeout
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .alerts import AlertRule, AmbientOneAlertEngine, alert_rules
+from .client.api import (
+    DATA_SOURCE_AVERAGES,
+    DATA_SOURCE_REALTIME,
+    MAX_CONCURRENT_REQUESTS,
+    SENSOR_COLUMNS,
+    AmbientOneAPIError,
+    AmbientOneAuthError,
+    AmbientOneClient,
+    AmbientOneSensorData,
+)
+from .client.downsample import AmbientOneDownsampler
+from .const import (
+    CONF_DATA_SOURCE,
+    CONF_MAX_CONCURRENCY,
+    CONF_SCAN_INTERVAL,
+    CONF_SENSORS,
+    CONF_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    DOMAIN,
+    EVENT_AMBIENT_ONE_ALERT,
+    SCAN_INTERVAL_SECONDS,
+)
+from .events import AmbientOneEventPoller
+from .profiler import AmbientOneProfiler
+
+if TYPE_CHECKING:
+    from .backfill import AmbientOneGapFiller
+    from .cache import AmbientOneReadingsCache
+
+_LOGGER = logging.getLogger(__name__)
+
+# Read by the air quality entity, which exists whatever sensors are enabled
+AIR_QUALITY_COLUMNS = (
+    "iaq_score",
+    "pm2_5",
+    "pm10_0",
+    "co2",
+    "aqi_category",
+    "primary_pollutant",
+)
+
+
+class AmbientOneCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Fetch devices and their latest readings for one account."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: AmbientOneClient,
+        options: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=SCAN_INTERVAL_SECONDS),
+        )
+        self.client = client
+        self.stats = client.stats
+        self.event_poller = AmbientOneEventPoller(hass, client)
+        self.profiler: AmbientOneProfiler | None = None
+        self.gap_filler: AmbientOneGapFiller | None = None
+        self.cache: AmbientOneReadingsCache | None = None
+        self.downsampler = AmbientOneDownsampler()
+        self._downsample_lock = asyncio.Lock()
+        self.alerts = AmbientOneAlertEngine()
+        self.timeout = DEFAULT_TIMEOUT
+        self.data_source = DATA_SOURCE_AVERAGES
+        self.apply_options(options or {})
+
+    def apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply config entry options, they take effect with the next update."""
+        self.update_interval = timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL_SECONDS)
+        )
+        self.timeout = options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        self.data_source = options.get(CONF_DATA_SOURCE, DATA_SOURCE_AVERAGES)
+        self.client.max_concurrency = options.get(
+            CONF_MAX_CONCURRENCY, MAX_CONCURRENT_REQUESTS
+        )
+        rules = alert_rules(options)
+        self.alerts.set_rules(rules)
+        self.client.sensor_columns = sensor_columns(options, rules)
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh data and update entities, profiled when requested."""
+        if self.profiler is None:
+            await super()._async_refresh(*args, **kwargs)
+            return
+
+        profiler = self.profiler
+        profiler.start_cycle(self)
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            profiler.end_cycle(self)
+            # A new profile may have been started during the refresh
+            if profiler.done_for(self) and self.profiler is profiler:
+                self.profiler = None
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Fetch data from API."""
+        started = time.monotonic()
+        self.stats.start_cycle()
+        error: str | None = None
+        device_data: dict[str, dict[str, Any]] = {}
+
+        try:
+            async with async_timeout.timeout(self.timeout):
+                device_data = await self.client.get_all_device_data(self.data_source)
+
+            if self.gap_filler is not None:
+                self.gap_filler.async_update(device_data, self.update_interval)
+
+            self._async_evaluate_alerts(device_data)
+
+            # Realtime readings only hold the IAQ score, they are not
+            # aggregated or cached
+            if self.data_source != DATA_SOURCE_REALTIME:
+                self.hass.async_create_background_task(
+                    self._async_store_readings(device_data),
+                    f"{DOMAIN}_store_readings",
+                )
+
+            # Events are best effort, they must not make sensors unavailable
+            try:
+                async with async_timeout.timeout(self.timeout):
+                    await self.event_poller.async_poll(
+                        [data["device"] for data in device_data.values()]
+                    )
+            except (AmbientOneAPIError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Failed to poll device events: %s", err)
+
+            return device_data
+        except AmbientOneAuthError as err:
+            error = str(err)
+            raise ConfigEntryAuthFailed(f"Authentication failed: {err}") from err
+        except AmbientOneAPIError as err:
+            error = str(err)
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        except asyncio.TimeoutError:
+            error = "Timeout"
+            raise
+        finally:
+            self.stats.record_cycle(
+                time.monotonic() - started,
+                error=error,
+                data_age=_data_age(device_data),
+            )
+
+    def _async_evaluate_alerts(self, device_data: dict[str, dict[str, Any]]) -> None:
+        """Update the alerts and fire an event for each one that changed."""
+        for change in self.alerts.evaluate(device_data, dt_util.utcnow()):
+            device = device_data[change.device_id]["device"]
+            self.hass.bus.async_fire(
+                EVENT_AMBIENT_ONE_ALERT,
+                {
+                    "device_id": change.device_id,
+                    "device_name": device.name,
+                    "alert": change.rule.key,
+                    "name": change.rule.name,
+                    "metric": change.rule.metric,
+                    "value": change.value,
+                    "active": change.active,
+                },
+            )
+
+    async def _async_store_readings(
+        self, device_data: dict[str, dict[str, Any]]
+    ) -> None:
+        """Add the new readings to the aggregates and the on-disk cache."""
+        readings = [
+            data["sensor_data"] for data in device_data.values() if data["sensor_data"]
+        ]
+        # A rebuild from the cache must see these readings in both or neither
+        async with self._downsample_lock:
+            self.downsampler.add_many(readings)
+            await self.async_cache_readings(readings)
+
+    async def async_cache_readings(self, readings: list[AmbientOneSensorData]) -> None:
+        """Add readings to the on-disk cache, if there is one."""
+        if self.cache is None or not readings:
+            return
+        try:
+            await self.hass.async_add_executor_job(self.cache.append, readings)
+        except OSError as err:
+            _LOGGER.warning("Failed to write the readings cache: %s", err)
+
+    async def async_store_history(self, readings: list[AmbientOneSensorData]) -> None:
+        """Merge fetched minutes into the cache and rebuild the aggregates from it.
+
+        Called with the readings the gap filler fetched, so the aggregates
+        get the minutes missed during an outage without a query of their own.
+        """
+        async with self._downsample_lock:
+            await self.async_cache_readings(readings)
+            if self.cache is None:
+                return
+            for device_id in {reading.device_id for reading in readings}:
+                if device_id is not None:
+                    self.downsampler.rebuild(
+                        device_id, await self._async_cached_readings(device_id)
+                    )
+
+    async def async_restore_aggregates(self) -> None:
+        """Restore the hour and day aggregates from the on-disk cache."""
+        if self.cache is None:
+            return
+        for device_id in self.cache.device_ids:
+            self.downsampler.add_many(await self._async_cached_readings(device_id))
+
+    async def _async_cached_readings(self, device_id: str) -> list[AmbientOneSensorData]:
+        """Return the cached readings of the current and the last complete day."""
+        end = dt_util.utcnow()
+        start = end.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        return await self.hass.async_add_executor_job(
+            self.cache.readings, device_id, start, end
+        )
+
+
+def sensor_columns(
+    options: Mapping[str, Any], rules: list[AlertRule]
+) -> tuple[str, ...] | None:
+    """Return the reading columns the enabled entities and alerts use.
+
+    None, for all columns, until the sensors option was set. Columns of
+    disabled sensors are not requested, so they are missing from the
+    aggregates and the readings cache, too.
+    """
+    if CONF_SENSORS not in options:
+        return None
+    columns = {
+        *AIR_QUALITY_COLUMNS,
+        *(rule.metric for rule in rules),
+        *(key for key in options[CONF_SENSORS] if key in SENSOR_COLUMNS),
+    }
+    return tuple(column for column in SENSOR_COLUMNS if column in columns)
+
+
+def _data_age(device_data: dict[str, dict[str, Any]]) -> dict[str, float | None]:
+    """Return seconds since each device's latest reading."""
+    now = dt_util.utcnow()
+    ages: dict[str, float | None] = {}
+    for device_id, data in device_data.items():
+        sensor_data = data.get("sensor_data")
+        timestamp = (
+            dt_util.parse_datetime(sensor_data.timestamp)
+            if sensor_data and sensor_data.timestamp
+            else None
+        )
+        ages[device_id] = (
+            round((now - timestamp).total_seconds(), 1) if timestamp else None
+        )
+    return ages
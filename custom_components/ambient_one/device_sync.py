@@ -0,0 +1,99 @@
+"""Device registry sync for Ambient One."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .client.api import AmbientOneDevice
+from .const import DOMAIN, MANUFACTURER, MODEL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def build_device_info(device: AmbientOneDevice) -> DeviceInfo:
+    """Return the device info used to register an Ambient One device."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, device.device_id)},
+        name=device.name,
+        manufacturer=MANUFACTURER,
+        model=MODEL,
+        sw_version=device.firmware_version,
+        suggested_area=suggested_area(device),
+    )
+
+
+def suggested_area(device: AmbientOneDevice) -> str | None:
+    """Return the area a device should be placed in, space before location."""
+    return device.space_name or device.location_name
+
+
+class AmbientOneDeviceSync:
+    """Push device changes from the API into the device registry.
+
+    Entities only hand their device info to the registry when they are
+    added, so later firmware or name changes would otherwise need a reload.
+    Each coordinator update is diffed against the last seen device list and
+    the registry is only touched for devices whose fields actually changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator) -> None:
+        """Initialize the device sync."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._known: dict[str, tuple[str, str | None, str | None]] = {}
+
+        # Entities register the devices from the first refresh themselves
+        for device_id, device_data in (coordinator.data or {}).items():
+            self._known[device_id] = self._fingerprint(device_data["device"])
+
+    @staticmethod
+    def _fingerprint(
+        device: AmbientOneDevice,
+    ) -> tuple[str, str | None, str | None]:
+        """Return the registry-relevant fields of a device."""
+        return (device.name, device.firmware_version, suggested_area(device))
+
+    @callback
+    def async_handle_coordinator_update(self) -> None:
+        """Update registry entries for devices that changed since last cycle."""
+        if not self.coordinator.data:
+            return
+
+        registry: dr.DeviceRegistry | None = None
+
+        for device_id, device_data in self.coordinator.data.items():
+            device = device_data["device"]
+            fingerprint = self._fingerprint(device)
+            previous = self._known.get(device_id)
+
+            if previous == fingerprint:
+                continue
+
+            self._known[device_id] = fingerprint
+
+            if previous is None:
+                # New devices are registered when their entities are added
+                continue
+
+            if registry is None:
+                registry = dr.async_get(self.hass)
+
+            entry = registry.async_get_device(identifiers={(DOMAIN, device_id)})
+            if entry is None:
+                continue
+
+            changes: dict[str, Any] = {}
+            if fingerprint[0] != previous[0]:
+                changes["name"] = fingerprint[0]
+            if fingerprint[1] != previous[1]:
+                changes["sw_version"] = fingerprint[1]
+            if fingerprint[2] != previous[2] and fingerprint[2]:
+                changes["suggested_area"] = fingerprint[2]
+
+            if changes:
+                _LOGGER.debug("Updating device %s in registry: %s", device_id, changes)
+                registry.async_update_device(entry.id, **changes)
@@ -0,0 +1,58 @@
+"""Diagnostics support for Ambient One."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    "access_token",
+    "refresh_token",
+    "title",
+    "unique_id",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    stats = coordinator.stats
+
+    devices: dict[str, Any] = {}
+    for device_id, device_data in (coordinator.data or {}).items():
+        device = device_data["device"]
+        sensor_data = device_data.get("sensor_data")
+        devices[device_id] = {
+            "firmware_version": device.firmware_version,
+            "last_seen": device.last_seen,
+            "battery_percentage": device.battery_percentage,
+            "wifi_rssi": device.wifi_rssi,
+            "reading_timestamp": sensor_data.timestamp if sensor_data else None,
+        }
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_s": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+        },
+        "devices": devices,
+        "readings_cache": coordinator.cache.as_dict() if coordinator.cache else None,
+        "aggregates": coordinator.downsampler.as_dict(),
+        "alerts": coordinator.alerts.as_dict(),
+        "stats": stats.as_dict(),
+        "poll_trace": stats.trace(),
+    }
@@ -0,0 +1,17 @@
+"""Base entity for Ambient One."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import AmbientOneCoordinator
+
+
+class AmbientOneEntity(CoordinatorEntity[AmbientOneCoordinator]):
+    """Coordinator entity that counts its state writes per update cycle."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self.coordinator.stats.record_state_write()
+        super()._handle_coordinator_update()
@@ -0,0 +1,114 @@
+"""Device event polling for Ambient One."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .client.api import AmbientOneClient, AmbientOneDevice, batched
+from .const import EVENT_AMBIENT_ONE
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENTS_PAGE_SIZE = 100
+
+
+class AmbientOneEventPoller:
+    """Fetch new device events incrementally and fire them on the event bus.
+
+    Devices are polled in `device_id=in.(...)` batches, so each cycle costs
+    one request per batch and only returns events newer than the oldest
+    cursor in the batch. After a poll every device of the batch is moved up
+    to the newest event returned, so a quiet device does not hold the batch
+    back. Cursors are kept per device, which keeps them correct when devices
+    move between batches. The first poll just primes the cursors so old
+    events are not replayed on startup.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: AmbientOneClient) -> None:
+        """Initialize the event poller."""
+        self.hass = hass
+        self.client = client
+        self._cursors: dict[str, str] = {}
+        # Cursor for devices that had no event yet when they were first seen
+        self._default_cursor: str | None = None
+        self._primed = False
+
+    async def async_poll(self, devices: list[AmbientOneDevice]) -> int:
+        """Fetch and fire events newer than the cursors, return how many fired."""
+        if not devices:
+            return 0
+
+        device_ids = [device.device_id for device in devices]
+
+        if not self._primed:
+            for batch in batched(device_ids):
+                latest = await self.client.get_events_since(batch)
+                if latest and latest[0].get("timestamp"):
+                    timestamp = latest[0]["timestamp"]
+                    if self._default_cursor is None or timestamp > self._default_cursor:
+                        self._default_cursor = timestamp
+            self._primed = True
+            return 0
+
+        names = {device.device_id: device.name for device in devices}
+        fired = 0
+        for batch in batched(device_ids):
+            fired += await self._async_poll_batch(batch, names)
+        return fired
+
+    async def _async_poll_batch(self, batch: list[str], names: dict[str, str]) -> int:
+        """Page through new events of one batch of devices."""
+        fired = 0
+
+        # With no cursor the account had no events yet, so all are new
+        cursors = {
+            device_id: self._cursors.get(device_id, self._default_cursor)
+            for device_id in batch
+        }
+        since = (
+            "-infinity" if None in cursors.values() else min(cursors.values())
+        )
+        newest: str | None = None
+        offset = 0
+
+        # Offset paging over one query, so events sharing the timestamp at a
+        # page boundary are neither skipped nor fetched twice
+        while True:
+            events = await self.client.get_events_since(
+                batch, since=since, limit=EVENTS_PAGE_SIZE, offset=offset
+            )
+            offset += len(events)
+
+            for event in events:
+                timestamp = event.get("timestamp")
+                if not timestamp:
+                    continue
+                newest = max(newest or timestamp, timestamp)
+                cursor = cursors.get(event.get("device_id"))
+                if cursor is not None and timestamp <= cursor:
+                    continue
+                self._fire(event, names)
+                fired += 1
+
+            if len(events) < EVENTS_PAGE_SIZE:
+                break
+
+        if newest is not None:
+            for device_id, cursor in cursors.items():
+                if cursor is None or newest > cursor:
+                    self._cursors[device_id] = newest
+        return fired
+
+    def _fire(self, event: dict[str, Any], names: dict[str, str]) -> None:
+        """Fire a single device event on the Home Assistant bus."""
+        device_id = event.get("device_id")
+        self.hass.bus.async_fire(
+            EVENT_AMBIENT_ONE,
+            {
+                **event,
+                "device_id": device_id,
+                "device_name": names.get(device_id),
+            },
+        )
@@ -0,0 +1,149 @@
+"""Opt-in profiling of the Ambient One update path."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# How often the event loop lag probe wakes up, in seconds
+LAG_PROBE_INTERVAL = 0.05
+# Lag above this counts as the loop being blocked, in seconds
+LAG_BLOCKED_THRESHOLD = 0.1
+
+
+class AmbientOneProfiler:
+    """Profile the next N refreshes of several coordinators and write a report.
+
+    Only one cProfile profiler can be active per thread, so all config
+    entries share one. It runs while any watched coordinator refreshes,
+    from the start of the refresh until all entities have written their
+    state, so network waits, JSON decoding, model construction and entity
+    updates all show up. cProfile sees the whole thread, so other tasks
+    running during the refresh are included as well. A probe task measures
+    how late the event loop wakes it up to spot blocking calls.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, cycles: int) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self.name = name
+        self.cycles = cycles
+        self.completed = 0
+        # Refreshes still to profile per watched coordinator
+        self._remaining: dict[Any, int] = {}
+        self._profile = cProfile.Profile()
+        self._profiling = False
+        self._active: dict[Any, float] = {}
+        self._probe: asyncio.Task | None = None
+        self._cycle_durations: list[float] = []
+        self._lag_max = 0.0
+        self._lag_total = 0.0
+        self._lag_blocked = 0
+
+    def watch(self, owner: Any) -> None:
+        """Profile the next refreshes of a coordinator."""
+        self._remaining[owner] = self.cycles
+
+    def done_for(self, owner: Any) -> bool:
+        """Return True once all refreshes of a coordinator were profiled."""
+        return self._remaining.get(owner, 0) <= 0
+
+    def start_cycle(self, owner: Any) -> None:
+        """Start profiling a refresh, profiling runs while any refresh does."""
+        self._active[owner] = time.perf_counter()
+        if len(self._active) > 1:
+            return
+
+        self._probe = self.hass.async_create_background_task(
+            self._async_probe_lag(), f"{self.name} event loop lag probe"
+        )
+        try:
+            self._profile.enable()
+            self._profiling = True
+        except ValueError as err:
+            # Another profiler is active in this thread
+            _LOGGER.warning("Cannot profile Ambient One updates: %s", err)
+
+    def end_cycle(self, owner: Any) -> None:
+        """Stop profiling a refresh, write the report after the last one."""
+        started = self._active.pop(owner, None)
+        if started is not None:
+            self._cycle_durations.append(time.perf_counter() - started)
+        if owner in self._remaining:
+            self._remaining[owner] -= 1
+        self.completed += 1
+
+        if self._active:
+            return
+        if self._profiling:
+            self._profile.disable()
+            self._profiling = False
+        if self._probe:
+            self._probe.cancel()
+            self._probe = None
+
+        if all(remaining <= 0 for remaining in self._remaining.values()):
+            self.hass.async_create_task(self._async_write_report())
+
+    async def _async_probe_lag(self) -> None:
+        """Measure how late the event loop runs a sleeping task."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            lag = loop.time() - started - LAG_PROBE_INTERVAL
+            self._lag_max = max(self._lag_max, lag)
+            self._lag_total += lag
+            if lag >= LAG_BLOCKED_THRESHOLD:
+                self._lag_blocked += 1
+
+    async def _async_write_report(self) -> None:
+        """Write the .prof and text report into the config directory."""
+        timestamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+        base = self.hass.config.path(f"{self.name}_profile_{timestamp}")
+        paths = await self.hass.async_add_executor_job(self._write_report, base)
+        _LOGGER.warning("Ambient One profile written to %s", ", ".join(paths))
+
+    def _write_report(self, base: str) -> list[str]:
+        """Write the report files, runs in the executor."""
+        prof_path = f"{base}.prof"
+        text_path = f"{base}.txt"
+        self._profile.dump_stats(prof_path)
+
+        output = io.StringIO()
+        durations = self._cycle_durations
+        output.write(f"Profiled refreshes: {self.completed}\n")
+        if durations:
+            output.write(
+                f"Refresh duration: mean {sum(durations) / len(durations) * 1000:.1f} ms,"
+                f" max {max(durations) * 1000:.1f} ms\n"
+            )
+        output.write(
+            f"Event loop lag: max {self._lag_max * 1000:.1f} ms,"
+            f" total {self._lag_total * 1000:.1f} ms,"
+            f" {self._lag_blocked} probe(s) late by"
+            f" >= {LAG_BLOCKED_THRESHOLD * 1000:.0f} ms\n\n"
+        )
+
+        try:
+            stats = pstats.Stats(self._profile, stream=output)
+        except TypeError:
+            # pstats refuses a profile without any calls
+            output.write("No calls were profiled.\n")
+        else:
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(25)
+
+        with open(text_path, "w", encoding="utf-8") as file:
+            file.write(output.getvalue())
+
+        return [prof_path, text_path]
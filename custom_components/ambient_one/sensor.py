@@ -17,14 +17,21 @@ from homeassistant.const import (
     CONCENTRATION_PARTS_PER_MILLION,
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
     UnitOfTemperature,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .api import AmbientOneDevice, AmbientOneSensorData
-from .const import DOMAIN
+from .client.api import AmbientOneDevice, AmbientOneSensorData
+from .client.stats import AmbientOneStats
+from .const import CONF_SENSORS, DOMAIN, MANUFACTURER, SIGNAL_OPTIONS_UPDATED
+from .device_sync import build_device_info
+from .entity import AmbientOneEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -139,6 +146,54 @@ SENSOR_TYPES: tuple[AmbientOneSensorEntityDescription, ...] = (
 )
 
 
+@dataclass
+class AmbientOneStatsSensorEntityDescription(SensorEntityDescription):
+    """Describes an Ambient One API statistics sensor."""
+
+    value_fn: Callable[[AmbientOneStats], float | int | None] | None = None
+
+
+STATS_SENSOR_TYPES: tuple[AmbientOneStatsSensorEntityDescription, ...] = (
+    AmbientOneStatsSensorEntityDescription(
+        key="api_latency_p95",
+        name="Latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: stats.latency_percentile(95),
+    ),
+    AmbientOneStatsSensorEntityDescription(
+        key="requests_per_hour",
+        name="Requests per hour",
+        native_unit_of_measurement="requests",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:api",
+        value_fn=lambda stats: stats.requests_last_hour,
+    ),
+    AmbientOneStatsSensorEntityDescription(
+        key="update_duration",
+        name="Update duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: stats.last_cycle_ms,
+    ),
+    AmbientOneStatsSensorEntityDescription(
+        key="api_errors",
+        name="Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:alert-circle-outline",
+        value_fn=lambda stats: sum(
+            endpoint.errors for endpoint in stats.endpoints.values()
+        ),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -147,12 +202,17 @@ async def async_setup_entry(
     """Set up Ambient One sensors from a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
-    entities: list[AmbientOneSensor] = []
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+
+    entities: list[SensorEntity] = []
+    added_keys = enabled_sensor_keys(entry)
 
     for device_id, device_data in coordinator.data.items():
         device = device_data["device"]
 
         for description in SENSOR_TYPES:
+            if description.key not in added_keys:
+                continue
             entities.append(
                 AmbientOneSensor(
                     coordinator,
@@ -161,10 +221,58 @@ async def async_setup_entry(
                 )
             )
 
+    for description in STATS_SENSOR_TYPES:
+        entities.append(
+            AmbientOneStatsSensor(coordinator, entry, client.stats, description)
+        )
+
     async_add_entities(entities)
 
+    @callback
+    def async_options_updated() -> None:
+        """Add and remove sensors after the sensor keys option changed."""
+        nonlocal added_keys
+        keys = enabled_sensor_keys(entry)
+        removed = added_keys - keys
+        added = keys - added_keys
+        added_keys = keys
+
+        if removed:
+            registry = er.async_get(hass)
+            removed_ids = {
+                f"{device_id}_{key}" for device_id in coordinator.data for key in removed
+            }
+            for entity_entry in er.async_entries_for_config_entry(
+                registry, entry.entry_id
+            ):
+                if entity_entry.unique_id in removed_ids:
+                    registry.async_remove(entity_entry.entity_id)
+
+        if added:
+            async_add_entities(
+                AmbientOneSensor(coordinator, device_data["device"], description)
+                for device_data in coordinator.data.values()
+                for description in SENSOR_TYPES
+                if description.key in added
+            )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), async_options_updated
+        )
+    )
+
 
-class AmbientOneSensor(CoordinatorEntity, SensorEntity):
+def enabled_sensor_keys(entry: ConfigEntry) -> set[str]:
+    """Return the sensor keys to create entities for, all by default."""
+    return set(
+        entry.options.get(
+            CONF_SENSORS, [description.key for description in SENSOR_TYPES]
+        )
+    )
+
+
+class AmbientOneSensor(AmbientOneEntity, SensorEntity):
     """Representation of an Ambient One sensor."""
 
     entity_description: AmbientOneSensorEntityDescription
@@ -185,13 +293,7 @@ class AmbientOneSensor(CoordinatorEntity, SensorEntity):
         self._attr_name = f"{device.name} {description.name}"
 
         # Device info for grouping entities
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, device.device_id)},
-            "name": device.name,
-            "manufacturer": "Ambient Works",
-            "model": "Ambient One",
-            "sw_version": device.firmware_version,
-        }
+        self._attr_device_info = build_device_info(device)
 
     @property
     def native_value(self) -> float | int | str | None:
@@ -248,3 +350,43 @@ class AmbientOneSensor(CoordinatorEntity, SensorEntity):
                 attributes["primary_pollutant"] = sensor_data.primary_pollutant
 
         return attributes
+
+
+class AmbientOneStatsSensor(AmbientOneEntity, SensorEntity):
+    """Diagnostic sensor exposing API client statistics."""
+
+    entity_description: AmbientOneStatsSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator,
+        entry: ConfigEntry,
+        stats: AmbientOneStats,
+        description: AmbientOneStatsSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._stats = stats
+
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        # "Ambient One API Errors", the descriptions leave out the "API"
+        self._attr_name = f"Ambient One API {description.name}"
+
+        # Statistics belong to the account, not to a single device
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer=MANUFACTURER,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True, the statistics matter most while updates fail."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current statistic."""
+        return self.entity_description.value_fn(self._stats)
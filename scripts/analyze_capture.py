@@ -4,30 +4,68 @@ Analyze mitmproxy capture to extract Ambient Works API details.
 
 Usage:
     python scripts/analyze_capture.py <capture_file>
+    python scripts/analyze_capture.py <capture_file> --performance
+
+The --performance report covers both the Ambient Works and the Supabase
+traffic. For each endpoint it lists p50/p95/p99 wait and receive times,
+request and response bytes, call frequency over time, and repeated requests
+for the same URL. Those show how the official app batches and caches.
 
 Supports:
     - .mitm (mitmproxy flow format)
     - .har (HTTP Archive format)
 """
 
+import argparse
+import bisect
+from datetime import datetime
+import hashlib
 import json
+import math
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
-from collections import defaultdict
+from typing import Dict, List, Any, Optional
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+from har_stream import BodySamples, iter_har_entries, response_text
+
+# Distinct URLs remembered per endpoint
+MAX_SAMPLE_URLS = 5
+
+# Domains included in the performance report
+PERFORMANCE_DOMAINS = ('ambientworks.io', 'supabase.co')
+# A repeated URL within this many seconds counts as a duplicate request
+DUPLICATE_WINDOW_SECONDS = 10
+# Distinct URLs counted per endpoint, PostgREST URLs with timestamp filters
+# are nearly all distinct
+MAX_TRACKED_URLS = 10000
+# Timing histogram buckets grow by this factor from 0.1 ms to 10 minutes
+TIMING_BUCKET_FACTOR = 1.05
+TIMING_BUCKETS_MS = [
+    0.1 * TIMING_BUCKET_FACTOR ** i
+    for i in range(math.ceil(math.log(600000 / 0.1, TIMING_BUCKET_FACTOR)) + 1)
+]
 
 
 def analyze_har_file(har_path: Path) -> Dict[str, Any]:
-    """Analyze HAR file for API patterns."""
-    with open(har_path) as f:
-        har = json.load(f)
+    """Analyze HAR file for API patterns.
 
-    api_calls = []
+    Entries are streamed from the file and only aggregated per endpoint, so
+    memory does not grow with the capture. Bodies are kept as bounded samples.
+    """
     domains = set()
     auth_methods = set()
-    endpoints = defaultdict(list)
-
-    for entry in har['log']['entries']:
+    endpoints = defaultdict(lambda: {
+        'calls': 0,
+        'statuses': Counter(),
+        'sample_urls': [],
+    })
+    request_samples = BodySamples()
+    response_samples = BodySamples()
+    total_calls = 0
+
+    for entry in iter_har_entries(har_path):
         request = entry['request']
         response = entry['response']
         url = request['url']
@@ -37,62 +75,241 @@ def analyze_har_file(har_path: Path) -> Dict[str, Any]:
             continue
 
         # Extract domain
-        from urllib.parse import urlparse
         parsed = urlparse(url)
         domains.add(parsed.netloc)
 
         # Extract auth headers
-        auth_headers = {}
         for header in request['headers']:
             name = header['name'].lower()
             if name in ['authorization', 'x-api-key', 'x-auth-token', 'cookie']:
                 auth_methods.add(f"{name}: {header['value'][:50]}...")
-                auth_headers[name] = header['value']
 
         # Extract endpoint pattern
         path = parsed.path
         endpoint_key = f"{request['method']} {path}"
 
-        # Parse request/response bodies
-        req_body = None
+        endpoint = endpoints[endpoint_key]
+        endpoint['calls'] += 1
+        endpoint['statuses'][response['status']] += 1
+        if len(endpoint['sample_urls']) < MAX_SAMPLE_URLS and url not in endpoint['sample_urls']:
+            endpoint['sample_urls'].append(url)
+
+        # Keep a few request/response bodies
         if request.get('postData'):
-            try:
-                req_body = json.loads(request['postData'].get('text', '{}'))
-            except:
-                req_body = request['postData'].get('text', '')
-
-        resp_body = None
-        if response.get('content'):
-            try:
-                resp_body = json.loads(response['content'].get('text', '{}'))
-            except:
-                resp_body = response['content'].get('text', '')
-
-        api_calls.append({
-            'method': request['method'],
-            'url': url,
-            'path': path,
-            'status': response['status'],
-            'auth_headers': auth_headers,
-            'request_body': req_body,
-            'response_body': resp_body,
-        })
-
-        endpoints[endpoint_key].append({
-            'url': url,
-            'status': response['status'],
-            'sample_response': resp_body,
-        })
+            request_samples.add(endpoint_key, request['postData'].get('text', ''))
+        response_samples.add(endpoint_key, response_text(entry))
+        total_calls += 1
 
     return {
         'domains': sorted(domains),
         'auth_methods': sorted(auth_methods),
-        'endpoints': dict(endpoints),
-        'api_calls': api_calls,
-        'total_calls': len(api_calls),
+        'endpoints': {
+            key: {
+                **endpoint,
+                'statuses': dict(endpoint['statuses']),
+                'sample_requests': request_samples.get(key),
+                'sample_responses': response_samples.get(key),
+                'oversized_responses': response_samples.skipped.get(key, 0),
+            }
+            for key, endpoint in endpoints.items()
+        },
+        'total_calls': total_calls,
+    }
+
+
+class TimingHistogram:
+    """Fixed-bucket histogram, percentiles are accurate to about 5%."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(TIMING_BUCKETS_MS) + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(TIMING_BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the percentile."""
+        if not self.count:
+            return None
+        rank = min(self.count - 1, int(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                upper = TIMING_BUCKETS_MS[index] if index < len(TIMING_BUCKETS_MS) else self.max
+                return round(min(upper, self.max), 1)
+        return round(self.max, 1)
+
+
+def _url_key(method: str, url: str) -> bytes:
+    """Return a short digest identifying a request URL."""
+    return hashlib.blake2b(f'{method} {url}'.encode(), digest_size=8).digest()
+
+
+def _started(entry: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(entry['startedDateTime'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _size(value: Any) -> int:
+    """HAR sizes are -1 when unknown."""
+    return value if isinstance(value, int) and value > 0 else 0
+
+
+def profile_har_file(har_path: Path) -> Dict[str, Any]:
+    """Collect per-endpoint latency, payload and frequency statistics.
+
+    Memory stays bounded: timings go into fixed-bucket histograms, URLs are
+    counted by an 8 byte digest for up to MAX_TRACKED_URLS per endpoint, and
+    only the text of repeated URLs is kept. Entries are assumed to be in
+    roughly chronological order, so URLs last seen before the duplicate
+    window are forgotten.
+    """
+    endpoints = defaultdict(lambda: {
+        'calls': 0,
+        'wait_ms': TimingHistogram(),
+        'receive_ms': TimingHistogram(),
+        'request_bytes': 0,
+        'response_bytes': 0,
+        'response_content_bytes': 0,
+        'minutes': Counter(),
+        'urls': Counter(),
+        'untracked_calls': 0,
+        'repeated_urls': {},
+        'duplicates_within_window': 0,
+    })
+    last_seen: Dict[bytes, datetime] = {}
+    prune_at = MAX_TRACKED_URLS
+    first_started = last_started = None
+
+    for entry in iter_har_entries(har_path):
+        request = entry['request']
+        response = entry['response']
+        url = request['url']
+        if not any(domain in url for domain in PERFORMANCE_DOMAINS):
+            continue
+
+        parsed = urlparse(url)
+        endpoint = endpoints[f"{request['method']} {parsed.netloc}{parsed.path}"]
+        endpoint['calls'] += 1
+
+        timings = entry.get('timings', {})
+        for key in ('wait', 'receive'):
+            value = timings.get(key)
+            if value is not None and value >= 0:
+                endpoint[f'{key}_ms'].add(value)
+
+        endpoint['request_bytes'] += _size(request.get('headersSize')) + _size(request.get('bodySize'))
+        endpoint['response_bytes'] += _size(response.get('headersSize')) + _size(response.get('bodySize'))
+        endpoint['response_content_bytes'] += _size((response.get('content') or {}).get('size'))
+
+        url_key = _url_key(request['method'], url)
+        urls = endpoint['urls']
+        if url_key in urls or len(urls) < MAX_TRACKED_URLS:
+            urls[url_key] += 1
+            if urls[url_key] == 2 and len(endpoint['repeated_urls']) < MAX_TRACKED_URLS:
+                endpoint['repeated_urls'][url_key] = f"{request['method']} {url}"
+        else:
+            endpoint['untracked_calls'] += 1
+
+        started = _started(entry)
+        if started is None:
+            continue
+        endpoint['minutes'][started.replace(second=0, microsecond=0).isoformat()] += 1
+        previous = last_seen.get(url_key)
+        if previous and (started - previous).total_seconds() <= DUPLICATE_WINDOW_SECONDS:
+            endpoint['duplicates_within_window'] += 1
+        last_seen[url_key] = started
+        first_started = min(first_started or started, started)
+        last_started = max(last_started or started, started)
+
+        if len(last_seen) >= prune_at:
+            last_seen = {
+                key: seen for key, seen in last_seen.items()
+                if (last_started - seen).total_seconds() <= DUPLICATE_WINDOW_SECONDS
+            }
+            prune_at = max(MAX_TRACKED_URLS, 2 * len(last_seen))
+
+    duration_minutes = (
+        max((last_started - first_started).total_seconds() / 60, 1)
+        if first_started else None
+    )
+
+    report = {}
+    for key, endpoint in endpoints.items():
+        calls = endpoint['calls']
+        report[key] = {
+            'calls': calls,
+            'calls_per_minute': round(calls / duration_minutes, 2) if duration_minutes else None,
+            'peak_calls_per_minute': max(endpoint['minutes'].values(), default=0),
+            'calls_by_minute': dict(sorted(endpoint['minutes'].items())),
+            **{
+                f'{timing}_ms_p{percentile}': endpoint[f'{timing}_ms'].percentile(percentile)
+                for timing in ('wait', 'receive')
+                for percentile in (50, 95, 99)
+            },
+            'request_bytes': endpoint['request_bytes'],
+            'response_bytes': endpoint['response_bytes'],
+            'response_content_bytes': endpoint['response_content_bytes'],
+            'distinct_urls': len(endpoint['urls']),
+            # Calls beyond MAX_TRACKED_URLS distinct URLs are not counted
+            'untracked_calls': endpoint['untracked_calls'],
+            'repeated_requests': calls - endpoint['untracked_calls'] - len(endpoint['urls']),
+            'duplicates_within_window': endpoint['duplicates_within_window'],
+            'most_repeated': [
+                {'url': endpoint['repeated_urls'][url_key], 'calls': count}
+                for url_key, count in endpoint['urls'].most_common(3)
+                if count > 1 and url_key in endpoint['repeated_urls']
+            ],
+        }
+
+    return {
+        'duration_minutes': round(duration_minutes, 1) if duration_minutes else None,
+        'total_calls': sum(endpoint['calls'] for endpoint in report.values()),
+        'duplicate_window_seconds': DUPLICATE_WINDOW_SECONDS,
+        'endpoints': report,
     }
 
 
+def print_performance(report: Dict[str, Any]):
+    """Pretty print the performance report."""
+    print("\n" + "="*80)
+    print("AMBIENT WORKS API PERFORMANCE")
+    print("="*80)
+
+    print(f"\n📊 {report['total_calls']} API call(s) over {report['duration_minutes']} minute(s)")
+
+    endpoints = sorted(
+        report['endpoints'].items(), key=lambda item: item[1]['calls'], reverse=True
+    )
+    for endpoint, info in endpoints:
+        print(f"\n  {endpoint}")
+        print(f"    Calls: {info['calls']} ({info['calls_per_minute']}/min, "
+              f"peak {info['peak_calls_per_minute']}/min)")
+        print(f"    Wait ms    p50/p95/p99: {info['wait_ms_p50']} / "
+              f"{info['wait_ms_p95']} / {info['wait_ms_p99']}")
+        print(f"    Receive ms p50/p95/p99: {info['receive_ms_p50']} / "
+              f"{info['receive_ms_p95']} / {info['receive_ms_p99']}")
+        print(f"    Bytes: {info['request_bytes']} sent, {info['response_bytes']} received "
+              f"({info['response_content_bytes']} decoded)")
+        print(f"    Distinct URLs: {info['distinct_urls']}, repeated: {info['repeated_requests']}, "
+              f"within {report['duplicate_window_seconds']} s: {info['duplicates_within_window']}")
+        if info['untracked_calls']:
+            print(f"      {info['untracked_calls']} call(s) beyond {MAX_TRACKED_URLS} "
+                  f"distinct URLs not counted")
+        for repeated in info['most_repeated']:
+            print(f"      {repeated['calls']}x {repeated['url']}")
+
+    print("\n" + "="*80)
+    print("\n💾 Full report saved to: api_performance.json")
+    print("="*80 + "\n")
+
+
 def print_analysis(analysis: Dict[str, Any]):
     """Pretty print the analysis results."""
     print("\n" + "="*80)
@@ -110,12 +327,15 @@ def print_analysis(analysis: Dict[str, Any]):
         print(f"  • {auth}")
 
     print("\n📡 API Endpoints Discovered:")
-    for endpoint, calls in sorted(analysis['endpoints'].items()):
+    for endpoint, info in sorted(analysis['endpoints'].items()):
         print(f"\n  {endpoint}")
-        print(f"    Called {len(calls)} time(s)")
+        print(f"    Called {info['calls']} time(s)")
 
         # Show sample response structure
-        sample = calls[0].get('sample_response')
+        samples = info['sample_responses']
+        sample = samples[0] if samples else None
+        if isinstance(sample, list) and sample and isinstance(sample[0], dict):
+            sample = sample[0]
         if sample and isinstance(sample, dict):
             print(f"    Response keys: {list(sample.keys())}")
 
@@ -130,13 +350,14 @@ def print_analysis(analysis: Dict[str, Any]):
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/analyze_capture.py <capture_file.har>")
-        print("\nCapture file can be:")
-        print("  - .har (HTTP Archive format) - Export from mitmweb")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Analyze a captured Ambient Works session')
+    parser.add_argument('capture_file', type=Path,
+                        help='.har (HTTP Archive format) - Export from mitmweb')
+    parser.add_argument('--performance', action='store_true',
+                        help='Report per-endpoint latency, payload sizes and request frequency')
+    args = parser.parse_args()
 
-    capture_file = Path(sys.argv[1])
+    capture_file = args.capture_file
 
     if not capture_file.exists():
         print(f"Error: File not found: {capture_file}")
@@ -144,13 +365,20 @@ def main():
 
     print(f"Analyzing: {capture_file}")
 
-    if capture_file.suffix == '.har':
-        analysis = analyze_har_file(capture_file)
-    else:
+    if capture_file.suffix != '.har':
         print(f"Error: Unsupported file format: {capture_file.suffix}")
         print("Please export as .har format from mitmweb")
         sys.exit(1)
 
+    if args.performance:
+        report = profile_har_file(capture_file)
+        with open(Path('api_performance.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        print_performance(report)
+        return
+
+    analysis = analyze_har_file(capture_file)
+
     # Save full analysis
     output_file = Path('api_analysis.json')
     with open(output_file, 'w') as f:
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Benchmark an Ambient One update cycle against the local fake Supabase server.
+
+Usage:
+    pip install pytest-homeassistant-custom-component
+    python scripts/benchmark_poll.py [--sizes 1,10,100,500] [--cycles 5]
+    python scripts/benchmark_poll.py --compare scripts/benchmark_baseline.json
+    python scripts/benchmark_poll.py --write-baseline scripts/benchmark_baseline.json
+    python scripts/benchmark_poll.py --har capture.har [--har-speed 1.0]
+    python scripts/benchmark_poll.py --history-hours 0
+
+Each cycle is one run of the real AmbientOneCoordinator._async_update_data
+in a test Home Assistant instance from pytest-homeassistant-custom-component:
+fetch all devices with their latest readings, evaluate alerts, then poll new
+device events. For every fleet size the fake server runs in its own process,
+so the reported CPU time is the integration's alone. Only request counts,
+compared exactly, and bytes, with a tolerance, can fail a comparison.
+Latency and CPU time vary between runs and are printed for information.
+With --har the cycles run against a replay of a captured session
+instead (see scripts/har_replay.py).
+
+A probe task measures how long the client blocks the event loop, during an
+extra cycle and while fetching --history-hours of minute history for the whole
+fleet, where large pages are decoded off the loop.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+import json
+import multiprocessing
+from pathlib import Path
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from custom_components.ambient_one.client import AmbientOneClient  # noqa: E402
+from custom_components.ambient_one.coordinator import AmbientOneCoordinator  # noqa: E402
+from fake_supabase import FakeSupabaseConfig, create_app  # noqa: E402
+import har_replay  # noqa: E402
+from pytest_homeassistant_custom_component.common import async_test_home_assistant  # noqa: E402
+
+DEFAULT_SIZES = [1, 10, 100, 500]
+# Relative growth that counts as a regression, generated values vary a bit
+BYTES_TOLERANCE = 0.05
+LAG_PROBE_INTERVAL = 0.005
+DEFAULT_HISTORY_HOURS = 1
+
+
+class LagProbe:
+    """Measure how late the event loop wakes up a sleeping task."""
+
+    def __init__(self) -> None:
+        self.lags: List[float] = []
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.lags.append(loop.time() - started - LAG_PROBE_INTERVAL)
+
+    def __enter__(self) -> 'LagProbe':
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._task.cancel()
+
+    @property
+    def max_ms(self) -> float:
+        return round(max(self.lags, default=0.0) * 1000, 2)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _run_server(port: int, config: FakeSupabaseConfig) -> None:
+    from aiohttp import web
+
+    web.run_app(create_app(config), host='127.0.0.1', port=port, print=None)
+
+
+def _run_replay_server(port: int, har_path: Path, speed: float) -> None:
+    from aiohttp import web
+
+    replay = har_replay.HarReplay(speed=speed)
+    replay.load(har_path)
+    web.run_app(har_replay.create_app(replay), host='127.0.0.1', port=port, print=None)
+
+
+async def _wait_for_server(base_url: str) -> None:
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(f'{base_url}/_stats'):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.05)
+    raise RuntimeError('Server did not start')
+
+
+async def _server_stats(session: aiohttp.ClientSession, base_url: str) -> Dict[str, Any]:
+    async with session.get(f'{base_url}/_stats') as response:
+        return await response.json()
+
+
+async def benchmark_history(client: AmbientOneClient, device_ids: List[str], hours: int) -> Dict[str, Any]:
+    """Fetch minute history of all devices and measure the event loop lag."""
+    end = datetime.now(timezone.utc)
+    endpoint = client.stats.endpoints['sensor_averages']
+    offloaded_before = endpoint.decodes_offloaded
+    blocking_before = endpoint.decode_blocking.sum_ms
+    started = time.perf_counter()
+    with LagProbe() as probe:
+        history = await client.get_sensor_history(device_ids, end - timedelta(hours=hours), end)
+    return {
+        'hours': hours,
+        'rows': len(history),
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        'loop_lag_ms_max': probe.max_ms,
+        'decode_blocking_ms': round(endpoint.decode_blocking.sum_ms - blocking_before, 2),
+        'decodes_offloaded': endpoint.decodes_offloaded - offloaded_before,
+    }
+
+
+async def benchmark_size(base_url: str, cycles: int, history_hours: int = 0) -> Dict[str, Any]:
+    """Run coordinator updates against a running fake server."""
+    client = AmbientOneClient('bench@example.com', 'secret', base_url=base_url)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(storage_dir=config_dir) as hass:
+            async with client, aiohttp.ClientSession() as control:
+                result = await _benchmark_coordinator(
+                    AmbientOneCoordinator(hass, client), control, base_url, cycles, history_hours
+                )
+            await hass.async_stop(force=True)
+    return result
+
+
+async def _benchmark_coordinator(
+    coordinator: AmbientOneCoordinator,
+    control: aiohttp.ClientSession,
+    base_url: str,
+    cycles: int,
+    history_hours: int,
+) -> Dict[str, Any]:
+    """Time coordinator updates, the first one primes the event cursors."""
+    client = coordinator.client
+
+    async def cycle() -> Dict[str, Any]:
+        device_data = await coordinator._async_update_data()
+        # Let the background tasks of the update, such as aggregating, finish
+        await coordinator.hass.async_block_till_done()
+        return device_data
+
+    # Warm up the connection pool and prime the event cursors
+    device_ids = list(await cycle())
+    await control.post(f'{base_url}/_reset')
+
+    latencies: List[float] = []
+    cpu_times: List[float] = []
+    bytes_before = sum(
+        endpoint.bytes_received for endpoint in client.stats.endpoints.values()
+    )
+
+    for _ in range(cycles):
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        await cycle()
+        cpu_times.append(time.process_time() - cpu_started)
+        latencies.append(time.perf_counter() - started)
+
+    server = await _server_stats(control, base_url)
+    bytes_received = sum(
+        endpoint.bytes_received for endpoint in client.stats.endpoints.values()
+    ) - bytes_before
+
+    # The probe's wakeups would skew the timed cycles, so it gets its own
+    with LagProbe() as probe:
+        await cycle()
+
+    history = await benchmark_history(client, device_ids, history_hours) if history_hours else None
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        'devices': len(device_ids),
+        'cycles': cycles,
+        'latency_ms_p50': round(statistics.median(latencies_ms), 2),
+        'latency_ms_p95': round(latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))], 2),
+        'latency_ms_max': round(latencies_ms[-1], 2),
+        'cpu_ms_per_cycle': round(sum(cpu_times) / cycles * 1000, 2),
+        'loop_lag_ms_max': probe.max_ms,
+        'requests_per_cycle': server['total_requests'] / cycles,
+        'requests_by_endpoint': {
+            endpoint: count / cycles for endpoint, count in sorted(server['requests'].items())
+        },
+        'bytes_per_cycle': round(bytes_received / cycles),
+        'history': history,
+    }
+
+
+def _benchmark_server(target, args: tuple, cycles: int, history_hours: int = 0) -> Dict[str, Any]:
+    """Start a server process, run the cycles against it and stop it."""
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = multiprocessing.Process(target=target, args=(port, *args), daemon=True)
+    server.start()
+    try:
+        asyncio.run(_wait_for_server(base_url))
+        return asyncio.run(benchmark_size(base_url, cycles, history_hours))
+    finally:
+        server.terminate()
+        server.join()
+
+
+def _print_result(label: str, result: Dict[str, Any]) -> None:
+    print(
+        f"{label:>4} devices: p50 {result['latency_ms_p50']:>9.2f} ms"
+        f"  p95 {result['latency_ms_p95']:>9.2f} ms"
+        f"  cpu {result['cpu_ms_per_cycle']:>8.2f} ms"
+        f"  {result['requests_per_cycle']:>6.1f} req"
+        f"  {result['bytes_per_cycle']:>9} B  per cycle"
+        f"  loop lag max {result['loop_lag_ms_max']:>7.2f} ms"
+    )
+    history = result.get('history')
+    if history:
+        print(
+            f"     history: {history['rows']} rows in {history['duration_ms']:.2f} ms"
+            f"  loop lag max {history['loop_lag_ms_max']:>7.2f} ms"
+            f"  decoding on the loop {history['decode_blocking_ms']:.2f} ms"
+            f"  {history['decodes_offloaded']} pages decoded off the loop"
+        )
+
+
+def run_har(har_path: Path, cycles: int, speed: float) -> Dict[str, Any]:
+    """Benchmark against a replayed capture."""
+    result = _benchmark_server(_run_replay_server, (har_path, speed), cycles)
+    _print_result(str(result['devices']), result)
+    return {
+        'har': str(har_path),
+        'har_speed': speed,
+        'cycles': cycles,
+        'python': sys.version.split()[0],
+        'results': {'har': result},
+    }
+
+
+def run(sizes: List[int], cycles: int, latency_ms: float, history_hours: int) -> Dict[str, Any]:
+    """Benchmark every fleet size, each against a fresh server process."""
+    results = {}
+    for size in sizes:
+        config = FakeSupabaseConfig(devices=size, latency_ms=latency_ms)
+        results[str(size)] = _benchmark_server(_run_server, (config,), cycles, history_hours)
+        _print_result(str(size), results[str(size)])
+    return {
+        'latency_ms': latency_ms,
+        'cycles': cycles,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> bool:
+    """Print differences to the baseline, return False on request or byte regressions."""
+    ok = True
+    print('\nComparison with baseline:')
+    for size, result in current['results'].items():
+        base = baseline['results'].get(size)
+        if not base:
+            print(f'  {size} devices: no baseline')
+            continue
+
+        if result['requests_per_cycle'] > base['requests_per_cycle']:
+            ok = False
+            print(f"  REGRESSION {size} devices requests_per_cycle: "
+                  f"{base['requests_per_cycle']} -> {result['requests_per_cycle']}")
+
+        if result['bytes_per_cycle'] > base['bytes_per_cycle'] * (1 + BYTES_TOLERANCE):
+            ok = False
+            print(f"  REGRESSION {size} devices bytes_per_cycle: "
+                  f"{base['bytes_per_cycle']} -> {result['bytes_per_cycle']}")
+
+        # Timings depend on the machine and its load, they never fail the comparison
+        for key in ('latency_ms_p50', 'latency_ms_p95', 'cpu_ms_per_cycle'):
+            if base[key]:
+                change = (result[key] - base[key]) / base[key] * 100
+                print(f'  info {size} devices {key}: {base[key]} -> {result[key]} ({change:+.0f}%)')
+
+    if ok:
+        print('  No request or byte regressions')
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Ambient One update cycles')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Simulated server latency per request')
+    parser.add_argument('--compare', type=Path, help='Baseline JSON to compare against')
+    parser.add_argument('--write-baseline', type=Path, help='Write results as new baseline')
+    parser.add_argument('--output', type=Path, help='Write results to this JSON file')
+    parser.add_argument('--har', type=Path, help='Replay this HAR capture instead of the fake server')
+    parser.add_argument('--har-speed', type=float, default=1.0,
+                        help='Multiplier for recorded timings, 0 replays instantly')
+    parser.add_argument('--history-hours', type=int, default=DEFAULT_HISTORY_HOURS,
+                        help='Hours of minute history to fetch per fleet, 0 to skip')
+    args = parser.parse_args()
+
+    if args.har:
+        current = run_har(args.har, args.cycles, args.har_speed)
+    else:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        current = run(sizes, args.cycles, args.latency_ms, args.history_hours)
+
+    for path in (args.output, args.write_baseline):
+        if path:
+            path.write_text(json.dumps(current, indent=2) + '\n')
+            print(f'\n💾 Results saved to: {path}')
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if not compare(current, baseline):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
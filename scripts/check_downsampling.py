@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Check the local hour and day aggregates against the server's.
+
+Usage:
+    pip install -e .
+    python scripts/check_downsampling.py [--devices 3] [--days 2] [--gap-hours 3]
+
+Starts the fake Supabase server in-process, fetches the minute averages of
+the last complete days once and folds them through AmbientOneDownsampler
+twice: one reading at a time, and as the coordinator does after an outage,
+missing --gap-hours hours of minutes and then rebuilding every device from
+all its readings, as the readings cache holds them once the gap filler
+fetched the missed minutes. Every completed hour and day bucket is
+compared with the row the server returns for aggregation_type hour and
+day. The server rounds its means to two decimals, so they must match
+within that. Exits with 1 if any bucket does not match.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+from typing import Dict, List, Tuple
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ambient_one import AmbientOneClient, AmbientOneDownsampler  # noqa: E402
+from ambient_one.api import SENSOR_METRICS  # noqa: E402
+from ambient_one.downsample import (  # noqa: E402
+    AGGREGATION_DAY,
+    AGGREGATION_HOUR,
+    AggregateBucket,
+    parse_timestamp,
+)
+from fake_supabase import FakeSupabaseConfig, create_app  # noqa: E402
+
+# Server means are rounded to two decimals
+TOLERANCE = 0.005 + 1e-9
+
+
+def _compare(
+    level: str,
+    local: Dict[Tuple[str, datetime], AggregateBucket],
+    server_rows: list,
+    minutes: int,
+) -> List[str]:
+    """Return a description of every bucket that does not match."""
+    errors = []
+    for row in server_rows:
+        start = datetime.fromisoformat(row.timestamp)
+        bucket = local.get((row.device_id, start))
+        if bucket is None:
+            errors.append(f'{level} {row.device_id} {start}: no local bucket')
+            continue
+        if bucket.readings != minutes:
+            errors.append(f'{level} {row.device_id} {start}: {bucket.readings} readings')
+        for metric in SENSOR_METRICS:
+            expected = getattr(row, metric)
+            stats = bucket.metrics.get(metric)
+            if expected is None or stats is None:
+                continue
+            if abs(stats.mean - expected) > TOLERANCE or not stats.min <= expected <= stats.max:
+                errors.append(
+                    f'{level} {row.device_id} {start} {metric}: '
+                    f'local {stats.mean:.4f}, server {expected}'
+                )
+    return errors
+
+
+def _buckets(
+    downsampler: AmbientOneDownsampler,
+    device_ids: List[str],
+    completed: List[Tuple[str, str, AggregateBucket]],
+) -> Dict[str, Dict[Tuple[str, datetime], AggregateBucket]]:
+    """Index the completed and the still open buckets by level, device and start."""
+    buckets: Dict[str, Dict[Tuple[str, datetime], AggregateBucket]] = {
+        AGGREGATION_HOUR: {},
+        AGGREGATION_DAY: {},
+    }
+    for device_id, level, bucket in completed:
+        buckets[level][(device_id, bucket.start)] = bucket
+    # The last buckets only complete with the next reading, they end at `end`
+    for device_id in device_ids:
+        for level in buckets:
+            bucket = downsampler.current(device_id, level)
+            if bucket is not None:
+                buckets[level][(device_id, bucket.start)] = bucket
+    return buckets
+
+
+def _every_minute(minutes: list, device_ids: List[str]):
+    """Fold every minute reading one at a time."""
+    downsampler = AmbientOneDownsampler()
+    completed = []
+    for reading in minutes:
+        for level, bucket in downsampler.add(reading):
+            completed.append((reading.device_id, level, bucket))
+    return _buckets(downsampler, device_ids, completed)
+
+
+def _outage(minutes: list, device_ids: List[str], gap_start: datetime, gap_hours: int):
+    """Miss the minutes of an outage, then rebuild from all readings, like the coordinator.
+
+    The gap filler fetches the missed minutes once the hour after the outage
+    is complete, the coordinator then rebuilds the current and the last
+    complete day of every device from the readings cache.
+    """
+    downsampler = AmbientOneDownsampler()
+    gap_end = gap_start + timedelta(hours=gap_hours)
+    rebuild_at = gap_end + timedelta(hours=1)
+    window_start = rebuild_at.replace(hour=0) - timedelta(days=1)
+
+    completed = []
+    rebuilt = False
+    for reading in minutes:
+        timestamp = parse_timestamp(reading.timestamp)
+        if not rebuilt and timestamp >= rebuild_at:
+            for device_id in device_ids:
+                cached = [
+                    cached for cached in minutes
+                    if cached.device_id == device_id
+                    and window_start <= parse_timestamp(cached.timestamp) < rebuild_at
+                ]
+                for level, bucket in downsampler.rebuild(device_id, cached):
+                    completed.append((device_id, level, bucket))
+            rebuilt = True
+        if gap_start <= timestamp < gap_end:
+            continue
+        for level, bucket in downsampler.add(reading):
+            completed.append((reading.device_id, level, bucket))
+    return _buckets(downsampler, device_ids, completed)
+
+
+async def run(devices: int, days: int, gap_hours: int) -> bool:
+    runner = web.AppRunner(create_app(FakeSupabaseConfig(devices=devices, history_days=days + 1)))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+
+    try:
+        client = AmbientOneClient('check@example.com', 'secret', base_url=f'http://127.0.0.1:{port}')
+        async with client:
+            device_ids = list(await client.get_all_device_data())
+            minutes = await client.get_sensor_history(device_ids, start, end)
+            hours = await client.get_sensor_history(device_ids, start, end, aggregation='hour')
+            day_rows = await client.get_sensor_history(device_ids, start, end, aggregation='day')
+    finally:
+        await runner.cleanup()
+
+    print(f'{len(minutes)} minute readings of {len(device_ids)} devices from {start} to {end}')
+    print(f'{len(hours)} hour and {len(day_rows)} day rows to compare')
+    ok = True
+    for name, buckets in (
+        ('Every minute', _every_minute(minutes, device_ids)),
+        (
+            f'After a {gap_hours} hour outage, rebuilt',
+            _outage(minutes, device_ids, start + timedelta(hours=13), gap_hours),
+        ),
+    ):
+        errors = _compare(AGGREGATION_HOUR, buckets[AGGREGATION_HOUR], hours, 60)
+        errors += _compare(AGGREGATION_DAY, buckets[AGGREGATION_DAY], day_rows, 1440)
+        print(f'  {name}: {"all aggregates match" if not errors else f"{len(errors)} mismatches"}')
+        for error in errors[:20]:
+            print(f'    MISMATCH {error}')
+        ok = ok and not errors
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check local downsampling against the server')
+    parser.add_argument('--devices', type=int, default=3)
+    parser.add_argument('--days', type=int, default=2)
+    parser.add_argument('--gap-hours', type=int, default=3, choices=range(1, 10), metavar='1-9')
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args.devices, args.days, args.gap_hours)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
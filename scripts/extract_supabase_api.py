@@ -1,25 +1,43 @@
 #!/usr/bin/env python3
-"""Extract Supabase API details from HAR file."""
+"""Extract Supabase API details from HAR file.
 
+Usage:
+    python scripts/extract_supabase_api.py <har_file>
+    python scripts/extract_supabase_api.py <capture_dir> [--jobs N]
+
+Given a directory, every *.har below it is scanned in a process pool. The
+results are merged into one catalogue, saved to supabase_api_catalogue.json.
+For each table it lists the inferred response schema (field names, JSON
+types, nullability, optional fields) and the PostgREST select, filter, order
+and limit parameters seen in the captures.
+"""
+
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import json
 import sys
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, parse_qsl
+
+from har_stream import BodySamples, iter_har_entries, response_text
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'and', 'or', 'on_conflict', 'columns'}
 
 
 def extract_supabase_api(har_path: Path):
     """Extract Supabase API information."""
-    with open(har_path) as f:
-        har = json.load(f)
-
     supabase_base = None
     api_key = None
     auth_token = None
     device_id = None
 
     endpoints = {}
+    samples = BodySamples()
 
-    for entry in har['log']['entries']:
+    for entry in iter_har_entries(har_path):
         url = entry['request']['url']
 
         if 'supabase.co' not in url:
@@ -57,15 +75,11 @@ def extract_supabase_api(har_path: Path):
                 'responses': []
             }
 
-        # Try to get response body
-        try:
-            if entry['response']['content'].get('text'):
-                response_text = entry['response']['content']['text']
-                response_data = json.loads(response_text)
-                if response_data:  # Only store non-empty responses
-                    endpoints[key]['responses'].append(response_data)
-        except:
-            pass
+        # Keep a few non-empty responses
+        samples.add(key, response_text(entry))
+
+    for key, info in endpoints.items():
+        info['responses'] = samples.get(key)
 
     # Print results
     print("="*80)
@@ -115,14 +129,219 @@ def extract_supabase_api(har_path: Path):
     print("\n" + "="*80)
 
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/extract_supabase_api.py <har_file>")
+def _json_type(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, list):
+        return 'array'
+    return 'object'
+
+
+def _new_table() -> Dict[str, Any]:
+    return {
+        'methods': Counter(),
+        'statuses': Counter(),
+        'rows': 0,
+        # Rows per select projection, fields are compared within one
+        'rows_by_select': Counter(),
+        'fields': defaultdict(
+            lambda: {'types': set(), 'present': 0, 'nulls': 0, 'present_by_select': Counter()}
+        ),
+        'select': Counter(),
+        'filters': defaultdict(set),
+        'order': Counter(),
+        'limits': set(),
+        'captures': set(),
+    }
+
+
+def _add_rows(table: Dict[str, Any], body: Any, select: str) -> None:
+    """Fold response rows of one select projection into the field statistics."""
+    rows = body if isinstance(body, list) else [body]
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        table['rows'] += 1
+        table['rows_by_select'][select] += 1
+        for name, value in row.items():
+            field = table['fields'][name]
+            field['present'] += 1
+            field['present_by_select'][select] += 1
+            if value is None:
+                field['nulls'] += 1
+            else:
+                field['types'].add(_json_type(value))
+
+
+def scan_capture(har_path: Path) -> Dict[str, Any]:
+    """Collect per-table query parameters and response fields of one capture."""
+    tables = defaultdict(_new_table)
+
+    for entry in iter_har_entries(har_path):
+        url = entry['request']['url']
+        if 'supabase.co' not in url:
+            continue
+
+        parsed = urlparse(url)
+        method = entry['request']['method']
+        if method == 'OPTIONS':
+            continue
+
+        table = tables[parsed.path]
+        table['methods'][method] += 1
+        table['statuses'][entry['response']['status']] += 1
+        table['captures'].add(str(har_path))
+
+        select = '*'
+        for name, value in parse_qsl(parsed.query, keep_blank_values=True):
+            if name == 'select':
+                select = value
+                table['select'][value] += 1
+            elif name == 'order':
+                table['order'][value] += 1
+            elif name == 'limit':
+                table['limits'].add(value)
+            elif name not in RESERVED_PARAMS:
+                operator = value.split('.', 1)[0] if '.' in value else value
+                table['filters'][name].add(operator)
+
+        text = response_text(entry)
+        if not text or entry['response']['status'] >= 300:
+            continue
+        try:
+            _add_rows(table, json.loads(text), select)
+        except ValueError:
+            pass
+
+    # Plain containers, results travel back from the worker processes
+    return {
+        path: {
+            **table,
+            'fields': {name: dict(field) for name, field in table['fields'].items()},
+            'filters': dict(table['filters']),
+        }
+        for path, table in tables.items()
+    }
+
+
+def merge_catalogues(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-capture scans into one endpoint catalogue."""
+    merged = defaultdict(_new_table)
+    for result in results:
+        for path, table in result.items():
+            target = merged[path]
+            for key in ('methods', 'statuses', 'select', 'order'):
+                target[key].update(table[key])
+            target['rows'] += table['rows']
+            target['rows_by_select'].update(table['rows_by_select'])
+            target['limits'] |= table['limits']
+            target['captures'] |= table['captures']
+            for name, operators in table['filters'].items():
+                target['filters'][name] |= operators
+            for name, field in table['fields'].items():
+                target_field = target['fields'][name]
+                target_field['types'] |= field['types']
+                target_field['present'] += field['present']
+                target_field['nulls'] += field['nulls']
+                target_field['present_by_select'].update(field['present_by_select'])
+
+    catalogue = {}
+    for path, table in sorted(merged.items()):
+        catalogue[path] = {
+            'methods': dict(table['methods']),
+            'statuses': dict(table['statuses']),
+            'captures': len(table['captures']),
+            'rows': table['rows'],
+            'schema': {
+                name: {
+                    'types': sorted(field['types']) or ['null'],
+                    'nullable': field['nulls'] > 0,
+                    # Missing from rows of a projection that returned it
+                    # elsewhere, a narrower select leaving it out does not count
+                    'optional': any(
+                        present < table['rows_by_select'][select]
+                        for select, present in field['present_by_select'].items()
+                    ),
+                    'present': field['present'],
+                }
+                for name, field in sorted(table['fields'].items())
+            },
+            'select': dict(table['select'].most_common()),
+            'filters': {name: sorted(ops) for name, ops in sorted(table['filters'].items())},
+            'order': dict(table['order'].most_common()),
+            'limits': sorted(table['limits'], key=lambda limit: (len(limit), limit)),
+        }
+    return catalogue
+
+
+def extract_directory(capture_dir: Path, jobs: Optional[int] = None) -> None:
+    """Scan all captures of a directory in parallel and save the catalogue."""
+    captures = sorted(capture_dir.rglob('*.har'))
+    if not captures:
+        print(f"Error: No .har files in {capture_dir}")
         sys.exit(1)
 
-    har_file = Path(sys.argv[1])
-    if not har_file.exists():
-        print(f"Error: File not found: {har_file}")
+    print(f"Scanning {len(captures)} capture(s) from {capture_dir}")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(scan_capture, captures))
+    catalogue = merge_catalogues(results)
+
+    print("="*80)
+    print("SUPABASE API CATALOGUE")
+    print("="*80)
+
+    for path, table in catalogue.items():
+        methods = ', '.join(f"{method} x{count}" for method, count in table['methods'].items())
+        print(f"\n{path}  ({methods}, in {table['captures']} capture(s))")
+        if table['schema']:
+            print(f"  Schema ({table['rows']} row(s)):")
+            for name, field in table['schema'].items():
+                flags = ''.join(
+                    f', {flag}' for flag in ('nullable', 'optional') if field[flag]
+                )
+                print(f"    {name}: {'|'.join(field['types'])}{flags}")
+        if table['select']:
+            print(f"  Select: {', '.join(table['select'])}")
+        if table['filters']:
+            filters = ', '.join(f"{name} ({'/'.join(ops)})" for name, ops in table['filters'].items())
+            print(f"  Filters: {filters}")
+        if table['order']:
+            print(f"  Order: {', '.join(table['order'])}")
+        if table['limits']:
+            print(f"  Limits: {', '.join(table['limits'])}")
+
+    output_path = Path('supabase_api_catalogue.json')
+    with open(output_path, 'w') as f:
+        json.dump({'captures': [str(path) for path in captures], 'tables': catalogue}, f, indent=2)
+
+    print("\n" + "="*80)
+    print(f"\n✅ Catalogue saved to: {output_path}")
+    print("\n" + "="*80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract Supabase API details from HAR captures')
+    parser.add_argument('path', type=Path, help='HAR file, or a directory of HAR files')
+    parser.add_argument('--jobs', type=int, help='Worker processes for a directory (default: CPU count)')
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        print(f"Error: File not found: {args.path}")
         sys.exit(1)
 
-    extract_supabase_api(har_file)
+    if args.path.is_dir():
+        extract_directory(args.path, args.jobs)
+    else:
+        extract_supabase_api(args.path)
+
+
+if __name__ == '__main__':
+    main()
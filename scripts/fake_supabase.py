@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Ambient Works Supabase API.
+
+Usage:
+    python scripts/fake_supabase.py [--devices 10] [--latency-ms 20] [--error-rate 0.01]
+
+Serves the endpoints AmbientOneClient uses with generated, deterministic
+data so the client and coordinator can be tested and benchmarked offline:
+
+    POST /auth/v1/token
+    GET  /rest/v1/devices
+    GET  /rest/v1/sensor_averages
+    GET  /rest/v1/sensor_realtime
+    GET  /rest/v1/device_events
+
+The PostgREST filters the client sends (eq./in./gt./gte./lt./lte., order,
+limit, offset) are honoured. GET /_stats returns request counters and
+POST /_reset clears them.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import json
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+MAX_ROWS = 1000  # Supabase's default max rows per response
+
+AGGREGATION_MINUTES = {"minute": 1, "hour": 60, "day": 1440}
+
+
+@dataclass
+class FakeSupabaseConfig:
+    """Behaviour of the fake server."""
+
+    devices: int = 1
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    history_days: int = 7
+    event_every_minutes: int = 30
+    token_expires_in: int = 3600
+    seed: int = 0
+
+
+def device_id(index: int) -> str:
+    """Return the ID of the device with the given index."""
+    return f"fake-device-{index:05d}"
+
+
+def device_index(device: str) -> int:
+    """Return the index of a fake device ID."""
+    return int(device.rsplit('-', 1)[1])
+
+
+def format_ts(ts: datetime) -> str:
+    """Format a timestamp the way Supabase does."""
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+def parse_ts(value: str) -> datetime:
+    """Parse a timestamp from a filter value."""
+    if value in ('-infinity', 'infinity'):
+        return datetime.min.replace(tzinfo=timezone.utc) if value[0] == '-' else (
+            datetime.max.replace(tzinfo=timezone.utc)
+        )
+    ts = datetime.fromisoformat(value.replace(' ', '+'))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def minute_reading(index: int, minute: int) -> Dict[str, float]:
+    """Return the generated minute values of a device at a Unix minute."""
+    phase = 2 * math.pi * minute / 1440 + index
+    wave = math.sin(phase)
+    return {
+        'pm1_0': round(3 + 2 * wave, 2),
+        'pm2_5': round(6 + 4 * wave, 2),
+        'pm4_0': round(7 + 4 * wave, 2),
+        'pm10_0': round(8 + 5 * wave, 2),
+        'temperature': round(21 + 2 * math.sin(phase / 2), 2),
+        'humidity': round(45 + 10 * math.cos(phase), 2),
+        'co2': round(650 + 250 * wave),
+        'voc_index': round(100 + 40 * wave),
+        'nox_index': round(1 + abs(wave)),
+        'iaq_score': round(7 + 2 * wave, 2),
+    }
+
+
+def aggregate_reading(index: int, start_minute: int, minutes: int) -> Dict[str, float]:
+    """Return the mean of the minute values in a bucket."""
+    totals: Dict[str, float] = Counter()
+    for minute in range(start_minute, start_minute + minutes):
+        for key, value in minute_reading(index, minute).items():
+            totals[key] += value
+    return {key: round(total / minutes, 2) for key, total in totals.items()}
+
+
+def category(iaq_score: float) -> str:
+    """Return the AQI category for an IAQ score."""
+    if iaq_score >= 7:
+        return 'Good'
+    if iaq_score >= 5:
+        return 'Moderate'
+    if iaq_score >= 3:
+        return 'Poor'
+    return 'Severe'
+
+
+class FakeSupabase:
+    """Request handlers and state of the fake server."""
+
+    def __init__(self, config: FakeSupabaseConfig) -> None:
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.requests: Counter = Counter()
+        self.errors_injected = 0
+        self.bytes_sent = 0
+        self.devices = [device_id(index) for index in range(config.devices)]
+        self._tokens = 0
+
+    # Helpers
+
+    def now(self) -> datetime:
+        """Return the current time."""
+        return datetime.now(timezone.utc)
+
+    async def _delay(self) -> None:
+        latency = self.config.latency_ms + self.random.uniform(0, self.config.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    @staticmethod
+    def _select(request: web.Request, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the columns of a plain select= list, like PostgREST."""
+        select = request.query.get('select', '*')
+        if select == '*':
+            return rows
+        columns = select.split(',')
+        return [{column: row[column] for column in columns if column in row} for row in rows]
+
+    def _json(self, data: Any, status: int = 200) -> web.Response:
+        body = json.dumps(data).encode()
+        self.bytes_sent += len(body)
+        return web.Response(body=body, status=status, content_type='application/json')
+
+    async def _prepare(self, request: web.Request, key: str, auth: bool = True):
+        """Count, delay and maybe fail a request, returns an error response."""
+        self.requests[key] += 1
+        await self._delay()
+
+        if 'apikey' not in request.headers:
+            return self._json({'message': 'No API key found in request'}, 401)
+        if auth and not request.headers.get('Authorization', '').startswith('Bearer '):
+            return self._json({'message': 'JWT expected'}, 401)
+        if self.config.error_rate and self.random.random() < self.config.error_rate:
+            self.errors_injected += 1
+            return self._json({'message': 'Injected error'}, 503)
+        return None
+
+    @staticmethod
+    def _device_filter(request: web.Request, devices: List[str]) -> List[str]:
+        value = request.query.get('device_id')
+        if value is None:
+            return devices
+        if value.startswith('eq.'):
+            wanted = {value[3:]}
+        elif value.startswith('in.(') and value.endswith(')'):
+            wanted = set(value[4:-1].split(','))
+        else:
+            raise web.HTTPBadRequest(text=f'Unsupported device_id filter: {value}')
+        return [device for device in devices if device in wanted]
+
+    @staticmethod
+    def _time_range(
+        request: web.Request, default_lo: datetime, default_hi: datetime
+    ) -> Tuple[datetime, datetime]:
+        lo, hi = default_lo, default_hi
+        for value in request.query.getall('timestamp', []):
+            operator, _, operand = value.partition('.')
+            ts = parse_ts(operand)
+            if operator == 'gt':
+                lo = max(lo, ts + timedelta(microseconds=1))
+            elif operator == 'gte':
+                lo = max(lo, ts)
+            elif operator == 'lt':
+                hi = min(hi, ts - timedelta(microseconds=1))
+            elif operator == 'lte':
+                hi = min(hi, ts)
+        return lo, hi
+
+    @staticmethod
+    def _paging(request: web.Request) -> Tuple[bool, int, int]:
+        descending = request.query.get('order', 'timestamp.asc').startswith(
+            'timestamp.desc'
+        )
+        limit = min(int(request.query.get('limit', MAX_ROWS)), MAX_ROWS)
+        offset = int(request.query.get('offset', 0))
+        return descending, limit, offset
+
+    # Handlers
+
+    async def token(self, request: web.Request) -> web.Response:
+        grant_type = request.query.get('grant_type')
+        if error := await self._prepare(request, f'auth:{grant_type}', auth=False):
+            return error
+
+        payload = await request.json()
+        if grant_type == 'password' and not payload.get('password'):
+            return self._json({'error': 'invalid_grant'}, 400)
+        if grant_type == 'refresh_token' and not payload.get('refresh_token'):
+            return self._json({'error': 'invalid_grant'}, 400)
+
+        self._tokens += 1
+        return self._json({
+            'access_token': f'fake-access-{self._tokens}',
+            'refresh_token': f'fake-refresh-{self._tokens}',
+            'expires_in': self.config.token_expires_in,
+            'token_type': 'bearer',
+            'user': {'id': USER_ID},
+        })
+
+    async def devices_handler(self, request: web.Request) -> web.Response:
+        if error := await self._prepare(request, 'devices'):
+            return error
+
+        now = format_ts(self.now())
+        return self._json([
+            {
+                'device_id': device,
+                'name': f'Room {device_index(device)}',
+                'last_seen': now,
+                'firmware_version': '1.0.0',
+                'space_id': f'space-{device_index(device)}',
+                'location_id': 'location-0',
+                'battery_percentage': 100 - device_index(device) % 50,
+                'wifi_rssi': -40 - device_index(device) % 40,
+                'organization_id': None,
+                'user_id': USER_ID,
+                'spaces': {'name': f'Room {device_index(device)}'},
+                'locations': {'name': 'Home'},
+            }
+            for device in self.devices
+        ])
+
+    async def sensor_averages(self, request: web.Request) -> web.Response:
+        if error := await self._prepare(request, 'sensor_averages'):
+            return error
+
+        aggregation = request.query.get('aggregation_type', 'eq.minute')[3:]
+        step = AGGREGATION_MINUTES.get(aggregation)
+        if step is None:
+            raise web.HTTPBadRequest(text=f'Unsupported aggregation: {aggregation}')
+
+        devices = self._device_filter(request, self.devices)
+        descending, limit, offset = self._paging(request)
+
+        # Only complete buckets exist
+        now_minute = int(self.now().timestamp() // 60)
+        newest = (now_minute // step - 1) * step
+        oldest = newest - self.config.history_days * 1440
+        lo, hi = self._time_range(
+            request,
+            datetime.fromtimestamp(oldest * 60, timezone.utc),
+            datetime.fromtimestamp(newest * 60, timezone.utc),
+        )
+        first = max(oldest, math.ceil(lo.timestamp() / 60 / step) * step)
+        last = min(newest, math.floor(hi.timestamp() / 60 / step) * step)
+
+        buckets = range(last, first - 1, -step) if descending else range(first, last + 1, step)
+        rows = []
+        skip = offset
+        for bucket in buckets:
+            for device in devices:
+                if skip:
+                    skip -= 1
+                    continue
+                index = device_index(device)
+                values = (
+                    minute_reading(index, bucket)
+                    if step == 1
+                    else aggregate_reading(index, bucket, step)
+                )
+                rows.append({
+                    'device_id': device,
+                    'timestamp': format_ts(datetime.fromtimestamp(bucket * 60, timezone.utc)),
+                    'aggregation_type': aggregation,
+                    **values,
+                    'aqi_category': category(values['iaq_score']),
+                    'primary_pollutant': 'pm2_5',
+                })
+                if len(rows) >= limit:
+                    return self._json(self._select(request, rows))
+        return self._json(self._select(request, rows))
+
+    async def sensor_realtime(self, request: web.Request) -> web.Response:
+        if error := await self._prepare(request, 'sensor_realtime'):
+            return error
+
+        now = self.now()
+        minute = int(now.timestamp() // 60)
+        return self._json([
+            {
+                'device_id': device,
+                'iaq_score': minute_reading(device_index(device), minute)['iaq_score'],
+                'timestamp': format_ts(now.replace(microsecond=0)),
+            }
+            for device in self._device_filter(request, self.devices)
+        ])
+
+    async def device_events(self, request: web.Request) -> web.Response:
+        if error := await self._prepare(request, 'device_events'):
+            return error
+
+        devices = self._device_filter(request, self.devices)
+        descending, limit, offset = self._paging(request)
+
+        step = self.config.event_every_minutes
+        now_minute = int(self.now().timestamp() // 60)
+        newest = now_minute // step * step
+        oldest = newest - self.config.history_days * 1440
+        lo, hi = self._time_range(
+            request,
+            datetime.fromtimestamp(oldest * 60, timezone.utc),
+            datetime.fromtimestamp(newest * 60, timezone.utc),
+        )
+        first = max(oldest, math.ceil(lo.timestamp() / 60 / step) * step)
+        last = min(newest, math.floor(hi.timestamp() / 60 / step) * step)
+
+        buckets = range(last, first - 1, -step) if descending else range(first, last + 1, step)
+        rows = []
+        for bucket in buckets:
+            for device in devices:
+                if offset:
+                    offset -= 1
+                    continue
+                rows.append({
+                    'id': f'{device}-{bucket}',
+                    'device_id': device,
+                    'timestamp': format_ts(datetime.fromtimestamp(bucket * 60, timezone.utc)),
+                    'event_type': 'co2_high',
+                    'value': minute_reading(device_index(device), bucket)['co2'],
+                })
+                if len(rows) >= limit:
+                    return self._json(rows)
+        return self._json(rows)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'requests': dict(self.requests),
+            'total_requests': sum(self.requests.values()),
+            'errors_injected': self.errors_injected,
+            'bytes_sent': self.bytes_sent,
+        })
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.requests.clear()
+        self.errors_injected = 0
+        self.bytes_sent = 0
+        return web.json_response({})
+
+
+def create_app(config: Optional[FakeSupabaseConfig] = None) -> web.Application:
+    """Create the fake Supabase application."""
+    fake = FakeSupabase(config or FakeSupabaseConfig())
+    app = web.Application()
+    app['fake'] = fake
+    app.router.add_post('/auth/v1/token', fake.token)
+    app.router.add_get('/rest/v1/devices', fake.devices_handler)
+    app.router.add_get('/rest/v1/sensor_averages', fake.sensor_averages)
+    app.router.add_get('/rest/v1/sensor_realtime', fake.sensor_realtime)
+    app.router.add_get('/rest/v1/device_events', fake.device_events)
+    app.router.add_get('/_stats', fake.stats)
+    app.router.add_post('/_reset', fake.reset)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fake Supabase server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--devices', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeSupabaseConfig(
+        devices=args.devices,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Fake Supabase with {args.devices} device(s) on http://{args.host}:{args.port}")
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
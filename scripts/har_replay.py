@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Replay a captured HAR session as a local Supabase server.
+
+Usage:
+    python scripts/har_replay.py <capture.har> [--port 54322] [--speed 1.0]
+
+Serves the recorded Supabase responses so AmbientOneClient (and the
+integration, via `base_url`) can run against a real captured session with no
+network. Requests are matched on method, path and query. If the exact query
+was not recorded, the responses recorded for the same method and path are
+used instead. Responses for a key are replayed in recorded order and wrap
+around. Each response is delayed by its recorded wait and receive time,
+scaled by --speed (0 disables the delay). Like the fake server, GET /_stats
+returns request counters and POST /_reset clears them.
+"""
+
+import argparse
+import asyncio
+import base64
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+import sys
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from aiohttp import web
+
+from har_stream import iter_har_entries
+
+# Headers that must not be copied from the recording
+SKIPPED_HEADERS = {
+    'content-encoding',
+    'content-length',
+    'transfer-encoding',
+    'connection',
+    'keep-alive',
+}
+
+
+@dataclass
+class RecordedResponse:
+    """A response captured in the HAR file."""
+
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    delay: float
+
+
+def normalize_query(query: str) -> str:
+    """Return a query string with sorted parameters."""
+    return urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+
+
+def recorded_response(entry: dict) -> RecordedResponse:
+    """Build a replayable response from a HAR entry."""
+    response = entry['response']
+    content = response.get('content', {})
+    text = content.get('text') or ''
+    if content.get('encoding') == 'base64':
+        body = base64.b64decode(text)
+    else:
+        body = text.encode()
+
+    timings = entry.get('timings', {})
+    delay = sum(max(timings.get(key, 0) or 0, 0) for key in ('wait', 'receive')) / 1000
+
+    headers = [
+        (header['name'], header['value'])
+        for header in response.get('headers', [])
+        if header['name'].lower() not in SKIPPED_HEADERS
+    ]
+    return RecordedResponse(response['status'], headers, body, delay)
+
+
+class HarReplay:
+    """Index of recorded responses and the request handler serving them."""
+
+    def __init__(self, speed: float = 1.0) -> None:
+        self.speed = speed
+        self.exact: Dict[Tuple[str, str, str], List[RecordedResponse]] = defaultdict(list)
+        self.by_path: Dict[Tuple[str, str], List[RecordedResponse]] = defaultdict(list)
+        self._positions: Dict[tuple, int] = defaultdict(int)
+        self.requests: Counter = Counter()
+        self.misses = 0
+
+    def add_entry(self, entry: dict) -> None:
+        """Index a HAR entry if it is a Supabase request."""
+        url = entry['request']['url']
+        if 'supabase.co' not in url:
+            return
+
+        parsed = urlparse(url)
+        method = entry['request']['method']
+        if method == 'OPTIONS':
+            return
+
+        response = recorded_response(entry)
+        self.exact[(method, parsed.path, normalize_query(parsed.query))].append(response)
+        self.by_path[(method, parsed.path)].append(response)
+
+    def load(self, har_path: Path) -> int:
+        """Load all entries of a HAR file, return how many were indexed."""
+        for entry in iter_har_entries(har_path):
+            self.add_entry(entry)
+        return sum(len(responses) for responses in self.by_path.values())
+
+    def _next(self, key: tuple, responses: List[RecordedResponse]) -> RecordedResponse:
+        position = self._positions[key]
+        self._positions[key] = position + 1
+        return responses[position % len(responses)]
+
+    def lookup(self, method: str, path: str, query: str) -> Optional[RecordedResponse]:
+        """Return the next recorded response for a request."""
+        exact_key = (method, path, normalize_query(query))
+        if self.exact.get(exact_key):
+            return self._next(exact_key, self.exact[exact_key])
+        path_key = (method, path)
+        if self.by_path.get(path_key):
+            return self._next(path_key, self.by_path[path_key])
+        return None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests[request.path.rsplit('/', 1)[-1]] += 1
+        recorded = self.lookup(request.method, request.path, request.query_string)
+        if recorded is None:
+            self.misses += 1
+            return web.json_response(
+                {'message': f'No recorded response for {request.method} {request.path}'},
+                status=404,
+            )
+
+        if self.speed and recorded.delay:
+            await asyncio.sleep(recorded.delay * self.speed)
+
+        response = web.Response(body=recorded.body, status=recorded.status)
+        for name, value in recorded.headers:
+            response.headers.add(name, value)
+        return response
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'requests': dict(self.requests),
+            'total_requests': sum(self.requests.values()),
+            'misses': self.misses,
+        })
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.requests.clear()
+        self.misses = 0
+        return web.json_response({})
+
+
+def create_app(replay: HarReplay) -> web.Application:
+    """Create the replay application."""
+    app = web.Application()
+    app['replay'] = replay
+    app.router.add_get('/_stats', replay.stats)
+    app.router.add_post('/_reset', replay.reset)
+    app.router.add_route('*', '/{tail:.*}', replay.handle)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a HAR capture as a Supabase server')
+    parser.add_argument('har_file', type=Path)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54322)
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Multiplier for recorded timings, 0 replays instantly')
+    args = parser.parse_args()
+
+    if not args.har_file.exists():
+        print(f"Error: File not found: {args.har_file}")
+        sys.exit(1)
+
+    replay = HarReplay(speed=args.speed)
+    count = replay.load(args.har_file)
+    print(f"Replaying {count} Supabase response(s) from {args.har_file} "
+          f"on http://{args.host}:{args.port}")
+    web.run_app(create_app(replay), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
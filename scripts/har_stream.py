@@ -0,0 +1,209 @@
+"""
+Streaming reader for HAR captures.
+
+Multi-hour captures can be gigabytes, so the analysis scripts must not
+json.load them. iter_har_entries() walks the file with a small tokenizer and
+yields the objects of log.entries one at a time. Only the entry being parsed
+is held in memory. Response bodies are kept through BodySamples, which stores
+a bounded number of small samples per endpoint.
+"""
+
+import base64
+from collections import defaultdict
+import json
+from pathlib import Path
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+CHUNK_SIZE = 1 << 16
+# Bodies kept per endpoint, and the largest body that is kept at all
+MAX_SAMPLES = 3
+MAX_SAMPLE_BYTES = 64 * 1024
+
+WHITESPACE = ' \t\r\n'
+# Characters that matter when looking for the end of a value
+STRUCTURE = re.compile(r'["{}\[\]]')
+STRING_END = re.compile(r'["\\]')
+
+
+class _Reader:
+    """Character reader over a file that keeps only unconsumed text buffered."""
+
+    def __init__(self, f, chunk_size: int) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        # Read at least as much as is buffered, so a large entry is copied
+        # a logarithmic number of times
+        chunk = self._f.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _char_at(self, offset: int) -> Optional[str]:
+        """Return the character at offset from the read position, None at EOF."""
+        while self._pos + offset >= len(self._buf):
+            if not self._fill():
+                return None
+        return self._buf[self._pos + offset]
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            char = self._char_at(0)
+            if char is None:
+                raise ValueError('Unexpected end of HAR file')
+            if char not in WHITESPACE:
+                return char
+            self._pos += 1
+
+    def expect(self, expected: str) -> None:
+        char = self.peek()
+        if char != expected:
+            raise ValueError(f'Expected {expected!r} in HAR file, found {char!r}')
+        self._pos += 1
+
+    def _value_length(self) -> int:
+        """Return the length of the JSON value at the read position."""
+        first = self.peek()
+        offset = 0
+
+        if first not in '{["':
+            # Number, true, false or null
+            while True:
+                char = self._char_at(offset)
+                if char is None or char in ',]}' + WHITESPACE:
+                    return offset
+                offset += 1
+
+        depth = 0
+        in_string = False
+        while True:
+            pattern = STRING_END if in_string else STRUCTURE
+            match = pattern.search(self._buf, self._pos + offset)
+            if match is None:
+                # An escaped character may still be ahead of the buffer end
+                offset = max(offset, len(self._buf) - self._pos)
+                if not self._fill():
+                    raise ValueError('Unexpected end of HAR file')
+                continue
+
+            char = match.group()
+            offset = match.end() - self._pos
+            if in_string:
+                if char == '\\':
+                    offset += 1
+                else:
+                    in_string = False
+                    if depth == 0:
+                        return offset
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return offset
+
+    def read_value(self) -> Any:
+        """Parse and consume the JSON value at the read position."""
+        length = self._value_length()
+        text = self._buf[self._pos:self._pos + length]
+        self._pos += length
+        return json.loads(text)
+
+    def skip_value(self) -> None:
+        length = self._value_length()
+        self._pos += length
+
+    def iter_keys(self) -> Iterator[str]:
+        """Yield the keys of an object, the caller must consume each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect('}')
+                return
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the parsed items of an array one by one."""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect(']')
+                return
+
+
+def iter_har_entries(har_path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield the entries of a HAR file without loading the whole file."""
+    with open(har_path, encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        for key in reader.iter_keys():
+            if key != 'log':
+                reader.skip_value()
+                continue
+            for log_key in reader.iter_keys():
+                if log_key != 'entries':
+                    reader.skip_value()
+                    continue
+                yield from reader.iter_array()
+                # Nothing after the entries is needed
+                return
+
+
+def response_text(entry: Dict[str, Any]) -> str:
+    """Return the decoded response body of an entry, empty if there is none."""
+    content = entry['response'].get('content') or {}
+    text = content.get('text') or ''
+    if content.get('encoding') == 'base64':
+        try:
+            return base64.b64decode(text).decode('utf-8')
+        except (ValueError, UnicodeDecodeError):
+            return ''
+    return text
+
+
+class BodySamples:
+    """Bounded samples of parsed bodies, keyed by endpoint."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES, max_bytes: int = MAX_SAMPLE_BYTES) -> None:
+        self.max_samples = max_samples
+        self.max_bytes = max_bytes
+        self.samples: Dict[str, List[Any]] = defaultdict(list)
+        self.skipped: Dict[str, int] = defaultdict(int)
+
+    def add(self, key: str, text: str) -> None:
+        """Keep a body as a sample if there is room and it is small enough."""
+        if not text or len(self.samples[key]) >= self.max_samples:
+            return
+        if len(text) > self.max_bytes:
+            self.skipped[key] += 1
+            return
+        try:
+            body = json.loads(text)
+        except ValueError:
+            body = text
+        if body:
+            self.samples[key].append(body)
+
+    def get(self, key: str) -> List[Any]:
+        return self.samples.get(key, [])
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Load test the Ambient One integration inside Home Assistant.
+
+Usage:
+    pip install pytest-homeassistant-custom-component
+    python scripts/load_test.py [--devices 300] [--refreshes 10] [--latency-ms 0]
+
+Starts a test Home Assistant instance from pytest-homeassistant-custom-component,
+sets up the integration against the local fake Supabase server with a large
+device fleet and drives coordinator refreshes. Reports:
+
+    - setup time, including async_forward_entry_setups for the platforms
+    - memory allocated per entity during setup (approximate, the fake
+      server runs in the same process)
+    - refresh duration and event loop lag while refreshing
+    - entity state writes per second and how long one round of entity
+      updates blocks the event loop
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from fake_supabase import FakeSupabaseConfig, create_app  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+from homeassistant import loader  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+
+from custom_components.ambient_one.const import CONF_BASE_URL, DOMAIN  # noqa: E402
+
+LAG_PROBE_INTERVAL = 0.01
+
+
+class LagProbe:
+    """Measure how late the event loop wakes up a sleeping task."""
+
+    def __init__(self) -> None:
+        self.lags: List[float] = []
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.lags.append(loop.time() - started - LAG_PROBE_INTERVAL)
+
+    def __enter__(self) -> 'LagProbe':
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._task.cancel()
+
+    def summary(self) -> Dict[str, float]:
+        lags_ms = sorted(lag * 1000 for lag in self.lags) or [0.0]
+        return {
+            'lag_ms_p50': round(statistics.median(lags_ms), 2),
+            'lag_ms_p99': round(lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))], 2),
+            'lag_ms_max': round(lags_ms[-1], 2),
+        }
+
+
+async def run(devices: int, refreshes: int, latency_ms: float) -> Dict[str, Any]:
+    """Set up the integration against a fake fleet and measure it."""
+    runner = web.AppRunner(create_app(FakeSupabaseConfig(devices=devices, latency_ms=latency_ms)))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f'http://127.0.0.1:{port}'
+
+    results: Dict[str, Any] = {'devices': devices, 'refreshes': refreshes}
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(storage_dir=config_dir) as hass:
+            # Load custom_components from the repository
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+
+            forward_times: List[float] = []
+            original_forward = hass.config_entries.async_forward_entry_setups
+
+            async def timed_forward(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await original_forward(*args, **kwargs)
+                finally:
+                    forward_times.append(time.perf_counter() - started)
+
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    'email': 'load@example.com',
+                    'password': 'secret',
+                    CONF_BASE_URL: base_url,
+                },
+                title='Ambient One (load test)',
+            )
+            entry.add_to_hass(hass)
+
+            tracemalloc.start()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            with patch.object(hass.config_entries, 'async_forward_entry_setups', timed_forward):
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+            setup_time = time.perf_counter() - started
+            memory_after = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            entities = len(hass.states.async_all())
+            results.update({
+                'entities': entities,
+                'setup_s': round(setup_time, 3),
+                'forward_entry_setups_s': round(sum(forward_times), 3),
+                'memory_kib_per_entity': round(
+                    (memory_after - memory_before) / 1024 / max(entities, 1), 2
+                ),
+            })
+
+            coordinator = hass.data[DOMAIN][entry.entry_id]['coordinator']
+            state_changes = 0
+
+            def count_state_change(event) -> None:
+                nonlocal state_changes
+                state_changes += 1
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_change)
+
+            # Full refreshes: fetch, parse and update all entities
+            refresh_times = []
+            with LagProbe() as refresh_lag:
+                for _ in range(refreshes):
+                    started = time.perf_counter()
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    refresh_times.append(time.perf_counter() - started)
+
+            # Entity updates alone, without any network. Listeners run
+            # synchronously, so each call blocks the loop for its duration.
+            writes_before = coordinator.stats.cycle_trace[-1]['state_writes']
+            write_times = []
+            for _ in range(refreshes):
+                started = time.perf_counter()
+                coordinator.async_update_listeners()
+                write_times.append(time.perf_counter() - started)
+                await hass.async_block_till_done()
+            write_time = sum(write_times)
+            writes = coordinator.stats.cycle_trace[-1]['state_writes'] - writes_before
+
+            refresh_ms = sorted(duration * 1000 for duration in refresh_times)
+            results.update({
+                'refresh_ms_p50': round(statistics.median(refresh_ms), 2),
+                'refresh_ms_max': round(refresh_ms[-1], 2),
+                'refresh_state_changes': state_changes,
+                'refresh': refresh_lag.summary(),
+                'state_writes': writes,
+                'state_writes_per_s': round(writes / write_time) if write_time else None,
+                'entity_update_blocks_loop_ms_max': round(max(write_times) * 1000, 2),
+            })
+
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            await hass.async_stop(force=True)
+
+    await runner.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Ambient One integration')
+    parser.add_argument('--devices', type=int, default=300)
+    parser.add_argument('--refreshes', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--output', type=Path, help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.devices, args.refreshes, args.latency_ms))
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()